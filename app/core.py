@@ -18,16 +18,21 @@ import json
 import logging
 import logging.handlers
 import os
-import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import socket
 import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, List, Callable
+from typing import Any, Dict, Optional, List, Callable, Tuple
 
-from pythonosc import dispatcher
-from pythonosc import osc_server
-from pythonosc import udp_client
+try:
+    import orjson  # parse/sérialisation JSON en C (optionnel)
+except Exception:
+    orjson = None
+
+from pythonosc.osc_packet import OscPacket
+from pythonosc.osc_bundle_builder import OscBundleBuilder, IMMEDIATELY
 from pythonosc.osc_message_builder import OscMessageBuilder
 
 from config.loader import load_user_config
@@ -63,6 +68,14 @@ OFFLINE_AFTER = 8.0
 CONNECT_REFRESH_EVERY = 6.0
 APPFLAGS_REFRESH_EVERY = 10.0
 
+# Équivalents entiers (ns) pour les comparaisons des chemins chauds
+HEARTBEAT_INTERVAL_NS = 2_000_000_000
+OFFLINE_AFTER_NS = 8_000_000_000
+CONNECT_REFRESH_EVERY_NS = 6_000_000_000
+APPFLAGS_REFRESH_EVERY_NS = 10_000_000_000
+# Appels force=True (warmup, reconcile, heal, pairing) : coalescés par IP sur cette fenêtre
+FORCE_COALESCE_NS = 2_000_000_000
+
 LOG_DIR = getattr(cfg, "LOG_DIR", "/var/log/qlab-box")
 STATE_DIR = getattr(cfg, "STATE_DIR", "/var/lib/qlab-box")
 LOG_FILE = os.path.join(LOG_DIR, "qlab-box.log")
@@ -78,6 +91,14 @@ def mono() -> float:
     return time.monotonic()
 
 
+def mono_ns() -> int:
+    return time.monotonic_ns()
+
+
+def sec_ns(sec: float) -> int:
+    return int(sec * 1_000_000_000)
+
+
 # =========================
 # LOGGING
 # =========================
@@ -113,6 +134,23 @@ def setup_logging(name: str = "qlab-box") -> logging.Logger:
 LOGGER = setup_logging()
 
 
+# =========================
+# JSON (orjson si dispo, sinon stdlib)
+# =========================
+def json_loads(buf: Any) -> Any:
+    """Accepte bytes ou str."""
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
+
+def json_dumps_pretty(obj: Any) -> bytes:
+    """JSON indenté (2 espaces), UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
 # =========================
 # STATE (cache + atomic save)
 # =========================
@@ -121,40 +159,56 @@ class StateManager:
     Lecture cache (mtime) + écriture atomique.
     - évite le spam disque dans une boucle daemon
     - garantit un state.json valide même en coupure alim (os.replace + fsync)
+    - n'écrit pas (ni fsync) si le contenu sérialisé est identique au fichier
     """
     def __init__(self, path: str) -> None:
         self.path = path
         self._lock = threading.RLock()
         self._cache: Dict[str, Any] = {}
-        self._mtime: float = -1.0
+        self._mtime: int = -1  # st_mtime_ns (résolution float insuffisante pour détecter 2 écritures rapprochées)
+        self._raw: Optional[bytes] = None  # contenu du fichier tel que lu/écrit en dernier
 
     def _read_file(self) -> Dict[str, Any]:
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                x = json.load(f)
-                return x if isinstance(x, dict) else {}
+            with open(self.path, "rb") as f:
+                raw = f.read()
         except Exception:
+            self._raw = None
             return {}
+        self._raw = raw
+        try:
+            x = json_loads(raw)
+            return x if isinstance(x, dict) else {}
+        except Exception:
+            return {}
+
+    def _disk_mtime(self) -> int:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except Exception:
+            return -1
 
     def load(self) -> Dict[str, Any]:
         with self._lock:
-            try:
-                mtime = os.stat(self.path).st_mtime
-            except Exception:
-                mtime = -1.0
-
+            mtime = self._disk_mtime()
             if mtime != self._mtime:
                 self._cache = self._read_file()
                 self._mtime = mtime
             return dict(self._cache)
 
     def save(self, st: Dict[str, Any]) -> None:
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        tmp = self.path + ".tmp"
+        data = json_dumps_pretty(st)
 
         with self._lock:
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(st, f, indent=2, ensure_ascii=False)
+            # no-op (même contenu, fichier non modifié depuis) : évite write + 2 fsync sur la SD
+            if data == self._raw and self._mtime >= 0 and self._disk_mtime() == self._mtime:
+                self._cache = dict(st)
+                return
+
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
                 f.flush()
                 os.fsync(f.fileno())
 
@@ -171,10 +225,8 @@ class StateManager:
                 pass
 
             self._cache = dict(st)
-            try:
-                self._mtime = os.stat(self.path).st_mtime
-            except Exception:
-                self._mtime = -1.0
+            self._raw = data
+            self._mtime = self._disk_mtime()
 
 
 STATE = StateManager(STATE_FILE)
@@ -189,11 +241,15 @@ class Endpoint:
     role: str  # "main" | "backup" | "aux"
     workspace_name: Optional[str] = None
     workspace_id: Optional[str] = None
-    last_seen_mono: float = 0.0
+    last_seen_mono: int = 0  # mono_ns()
 
     @property
     def online(self) -> bool:
-        return self.last_seen_mono > 0 and (mono() - self.last_seen_mono) < OFFLINE_AFTER
+        return self.online_at(mono_ns())
+
+    def online_at(self, now: int) -> bool:
+        # variante sans appel horloge : le tick daemon fournit son propre now (ns)
+        return self.last_seen_mono > 0 and (now - self.last_seen_mono) < OFFLINE_AFTER_NS
 
 
 # =========================
@@ -203,34 +259,38 @@ class ReplyWaiter:
     """
     Petit mécanisme de wait/notify (par clé).
     Permet d’attendre /workspaces ou /connect sur un IP connu.
+    Une seule Condition partagée : pas d'Event alloué par requête.
     """
     def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._events: Dict[str, threading.Event] = {}
+        self._cond = threading.Condition()
+        self._pending: set[str] = set()
         self._payloads: Dict[str, Any] = {}
 
-    def arm(self, key: str) -> threading.Event:
-        ev = threading.Event()
-        with self._lock:
-            self._events[key] = ev
+    def arm(self, key: str) -> str:
+        with self._cond:
+            self._pending.add(key)
             self._payloads.pop(key, None)
-        return ev
+        return key
 
     def set(self, key: str, payload: Any) -> None:
-        with self._lock:
+        with self._cond:
+            if key not in self._pending:
+                return
             self._payloads[key] = payload
-            ev = self._events.get(key)
-            if ev:
-                ev.set()
+            self._cond.notify_all()
+
+    def wait(self, key: str, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: key in self._payloads, timeout)
 
     def pop(self, key: str) -> Any:
-        with self._lock:
-            self._events.pop(key, None)
+        with self._cond:
+            self._pending.discard(key)
             return self._payloads.pop(key, None)
 
     def cleanup(self, key: str) -> None:
-        with self._lock:
-            self._events.pop(key, None)
+        with self._cond:
+            self._pending.discard(key)
             self._payloads.pop(key, None)
 
 
@@ -267,11 +327,15 @@ DISCOVERY = DiscoveryStore()
 # =========================
 # ROLE MAP (ip -> role)
 # =========================
+# Publication par remplacement atomique de la référence (jamais muté en place) :
+# les lecteurs (callback OSC) lisent sans verrou, seul l'écrivain le prend.
 ROLE_BY_IP: Dict[str, str] = {}
 _role_lock = threading.Lock()
 
 def refresh_role_map_from_state(st: Dict[str, Any]) -> None:
+    global ROLE_BY_IP
     mapping: Dict[str, str] = {}
+    live_ws = set()
     eps = st.get("endpoints", {})
     if isinstance(eps, dict):
         for role in ROLES:
@@ -280,102 +344,201 @@ def refresh_role_map_from_state(st: Dict[str, Any]) -> None:
                 ip = e.get("ip")
                 if isinstance(ip, str) and ip:
                     mapping[ip] = role
+                    live_ws.add((ip, e.get("workspace_id")))
     with _role_lock:
-        ROLE_BY_IP.clear()
-        ROLE_BY_IP.update(mapping)
+        ROLE_BY_IP = mapping
+
+    # clés /connect par wsid : chaque HEAL en ajoute une, on purge celles des wsid non appairés
+    if len(THROTTLE_NS) > THROTTLE_KEYS_MAX:
+        for k in [k for k in list(THROTTLE_NS) if len(k) == 3 and (k[1], k[2]) not in live_ws]:
+            THROTTLE_NS.pop(k, None)
+
+    # datagrammes pré-encodés : un wsid remplacé par HEAL n'est plus jamais envoyé
+    if len(_CONTROL_DGRAMS) > len(ROLES):
+        live_wsids = {wsid for _, wsid in live_ws}
+        for wsid in [w for w in list(_CONTROL_DGRAMS) if w not in live_wsids]:
+            _CONTROL_DGRAMS.pop(wsid, None)
 
 def role_from_ip(ip: str) -> Optional[str]:
-    with _role_lock:
-        return ROLE_BY_IP.get(ip)
+    return ROLE_BY_IP.get(ip)
 
 
 # =========================
 # LAST-SEEN (by IP)
 # =========================
-LAST_SEEN_BY_IP: Dict[str, float] = {}
-_last_seen_lock = threading.Lock()
+# Pas de verrou : une affectation dict[str] = int est atomique sous CPython
+# (GIL, et verrou par objet dict en free-threaded 3.13+). Lecteurs : .get() simple.
+LAST_SEEN_BY_IP: Dict[str, int] = {}
 
 def mark_seen(ip: str) -> None:
-    with _last_seen_lock:
-        LAST_SEEN_BY_IP[ip] = mono()
+    LAST_SEEN_BY_IP[ip] = mono_ns()
 
 
 # =========================
 # OSC SEND (queue worker)
 # =========================
-OSC_CLIENTS: Dict[str, udp_client.SimpleUDPClient] = {}
-_clients_lock = threading.Lock()
+# Buffers noyau explicites : absorbe les rafales (réponses /workspaces ~50 KB x N unités)
+OSC_SOCK_BUF = 2_000_000
+TX_EAGAIN_RETRIES = 3
+
+# Un seul socket UDP partagé pour tout l'émission vers QLab (unicast + fan-out broadcast) :
+# pas de client pythonosc par IP, les datagrammes sont construits par l'appelant.
+# Même port source que le /connect (passcode) : QLab reconnaît le client connecté.
+if hasattr(socket, "SOCK_NONBLOCK"):
+    _TX_SOCK = socket.socket(socket.AF_INET, socket.SOCK_DGRAM | socket.SOCK_NONBLOCK)
+else:
+    _TX_SOCK = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    _TX_SOCK.setblocking(False)
+try:
+    _TX_SOCK.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, OSC_SOCK_BUF)
+except OSError:
+    pass
+_TX_SOCK.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+
+def _build_message(path: str, args: Any = ()) -> Any:
+    msg = OscMessageBuilder(address=path)
+    for a in args:
+        msg.add_arg(a)
+    return msg.build()
+
+
+def build_dgram(path: str, args: Any = ()) -> bytes:
+    return _build_message(path, args).dgram
+
+
+def build_bundle(msgs: List[Tuple[str, Any]]) -> bytes:
+    """Bundle OSC (exécution immédiate) : un seul datagramme pour N messages."""
+    bundle = OscBundleBuilder(IMMEDIATELY)
+    for path, args in msgs:
+        bundle.add_content(_build_message(path, args))
+    return bundle.build().dgram
 
-def get_client(ip: str, port: int = QLAB_PORT) -> udp_client.SimpleUDPClient:
-    with _clients_lock:
-        c = OSC_CLIENTS.get(ip)
-        if c is None:
-            c = udp_client.SimpleUDPClient(ip, port)
-            OSC_CLIENTS[ip] = c
-        return c
+
+TX_BATCH_MAX = 32
+TX_QUEUE_MAX = 1000
 
 
 class SendWorker(threading.Thread):
     """
     Un seul thread d’émission OSC.
     Avantage : pas de threads jetables à chaque action, pas de blocage des callbacks GPIO.
+    Les rafales (GO vers main+backup+aux, flags...) sont dépilées en un seul passage
+    sous verrou puis envoyées dos à dos (sendto ; sendmmsg via ctypes mesuré plus lent).
+    Coalescence sur demande (coalesce=True) : un datagramme identique déjà en attente
+    pour la même destination n'est pas ré-empilé. Réservé au trafic idempotent
+    (flags, /connect, thump, /workspaces, PANIC bloqué) ; GO/PAUSE/RESUME/select
+    partent toujours, chaque appui compte.
     """
-    def __init__(self) -> None:
+    def __init__(self, sock: socket.socket) -> None:
         super().__init__(daemon=True)
-        self.q: "queue.Queue[tuple[str, str, Any]]" = queue.Queue(maxsize=1000)
+        self.sock = sock
+        self._cond = threading.Condition()
+        self._q: "deque[Tuple[str, int, bytes]]" = deque()
+        self._pending: set[Tuple[str, int, bytes]] = set()
         self._stop = False
 
     def stop(self) -> None:
         self._stop = True
 
-    def send(self, ip: str, path: str, arg: Any) -> None:
-        try:
-            self.q.put_nowait((ip, path, arg))
-        except queue.Full:
-            LOGGER.warning("OSC TX queue full -> drop")
-
-    def run(self) -> None:
-        while not self._stop:
-            try:
-                ip, path, arg = self.q.get(timeout=0.5)
-            except queue.Empty:
-                continue
+    def send(self, ip: str, port: int, dgram: bytes, coalesce: bool = False) -> None:
+        item = (ip, port, dgram)
+        with self._cond:
+            if coalesce and item in self._pending:
+                return
+            if len(self._q) >= TX_QUEUE_MAX:
+                LOGGER.warning("OSC TX queue full -> drop")
+                return
+            self._q.append(item)
+            if coalesce:
+                self._pending.add(item)
+            self._cond.notify()
+
+    def send_raw(self, ip: str, dgram: bytes, coalesce: bool = False) -> None:
+        self.send(ip, QLAB_PORT, dgram, coalesce)
+
+    def _flush(self, batch: List[Tuple[str, int, bytes]]) -> None:
+        for ip, port, dgram in batch:
+            self._sendto(ip, port, dgram)
+
+    def _sendto(self, ip: str, port: int, dgram: bytes) -> None:
+        # socket non bloquant : buffer plein (EAGAIN) -> courte attente, nombre d'essais borné
+        for attempt in range(TX_EAGAIN_RETRIES + 1):
             try:
-                get_client(ip).send_message(path, arg)
+                self.sock.sendto(dgram, (ip, port))
+                return
+            except BlockingIOError:
+                if attempt == TX_EAGAIN_RETRIES:
+                    LOGGER.debug("OSC TX buffer full -> drop ip=%s port=%d", ip, port)
+                    return
+                time.sleep(0.001)
             except Exception as e:
-                LOGGER.debug("OSC TX error ip=%s path=%s: %s", ip, path, e)
-            finally:
-                self.q.task_done()
+                LOGGER.debug("OSC TX error ip=%s port=%d: %s", ip, port, e)
+                return
 
-
-SENDW = SendWorker()
+    def run(self) -> None:
+        while not self._stop:
+            with self._cond:
+                if not self._q and not self._cond.wait(timeout=0.5):
+                    continue
+                batch = []
+                while self._q and len(batch) < TX_BATCH_MAX:
+                    item = self._q.popleft()
+                    self._pending.discard(item)
+                    batch.append(item)
+            # envoi hors verrou : send() n'attend jamais le réseau
+            if batch:
+                self._flush(batch)
+
+
+SENDW = SendWorker(_TX_SOCK)
 SENDW.start()
 
 
-def send_app(ip: str, path: str, *args: Any) -> None:
-    if args:
-        SENDW.send(ip, path, args[0] if len(args) == 1 else list(args))
-    else:
-        SENDW.send(ip, path, [])
+def send_app(ip: str, path: str, *args: Any, coalesce: bool = False) -> None:
+    SENDW.send(ip, QLAB_PORT, build_dgram(path, args), coalesce)
 
-def send_ws(ip: str, wsid: str, suffix: str, *args: Any) -> str:
+def send_ws(ip: str, wsid: str, suffix: str, *args: Any, coalesce: bool = False) -> str:
     full = f"/workspace/{wsid}/{suffix}".replace("//", "/")
-    if args:
-        SENDW.send(ip, full, args[0] if len(args) == 1 else list(args))
-    else:
-        SENDW.send(ip, full, [])
+    SENDW.send(ip, QLAB_PORT, build_dgram(full, args), coalesce)
     return full
 
 def send_ws_fast(ip: str, wsid: str, suffix: str) -> str:
     full = f"/workspace/{wsid}/{suffix}".replace("//", "/")
-    SENDW.send(ip, full, [])
+    SENDW.send(ip, QLAB_PORT, build_dgram(full))
     return full
 
 
+# Datagrammes pré-encodés des commandes sans argument, par workspace_id.
+# Indexés par wsid (et non stockés sur Endpoint) : un changement de wsid (HEAL) ne peut pas
+# réutiliser d'anciens octets, et les Endpoint rechargés depuis le state en profitent aussi.
+# Borné : refresh_role_map_from_state retire les wsid qui ne sont plus appairés.
+CONTROL_SUFFIXES = ("go", "panic", "stop", "pause", "resume", "select/next", "select/previous")
+_CONTROL_DGRAMS: Dict[str, Dict[str, bytes]] = {}
+# Seule commande de contrôle coalescée : un PANIC répété (bouton bloqué) n'apporte rien de plus
+_COALESCE_SUFFIXES = frozenset({"panic"})
+
+def control_dgrams(wsid: str) -> Dict[str, bytes]:
+    d = _CONTROL_DGRAMS.get(wsid)
+    if d is None:
+        d = {sfx: build_dgram(f"/workspace/{wsid}/{sfx}") for sfx in CONTROL_SUFFIXES}
+        _CONTROL_DGRAMS[wsid] = d
+    return d
+
+def send_ws_precomputed(ep: Endpoint, suffix: str) -> None:
+    if not ep.workspace_id:
+        return
+    dgram = control_dgrams(ep.workspace_id).get(suffix)
+    if dgram is None:
+        send_ws_fast(ep.ip, ep.workspace_id, suffix)
+        return
+    SENDW.send_raw(ep.ip, dgram, suffix in _COALESCE_SUFFIXES)
+
+
 # =========================
 # OSC SERVER (singleton)
 # =========================
-OSC_SERVER = None
+OSC_SERVER: Optional["OscReceiver"] = None
 _on_ack: Optional[Callable[[str, str], None]] = None  # callback(ip, role)
 
 def set_ack_callback(cb: Optional[Callable[[str, str], None]]) -> None:
@@ -386,51 +549,115 @@ def _osc_handler(client_address, address: str, *args: Any) -> None:
     src_ip = client_address[0] if client_address else "0.0.0.0"
     payload = args[0] if args else None
 
-    if isinstance(payload, (bytes, bytearray)):
-        try:
-            payload = payload.decode("utf-8", errors="ignore")
-        except Exception:
-            return
-    if not isinstance(payload, str):
+    # bytes/str passés tels quels au parseur : pas de décodage intermédiaire
+    if isinstance(payload, (bytes, bytearray, str)):
+        raw = payload
+    elif isinstance(payload, memoryview):
+        raw = payload.tobytes()
+    else:
         return
-    if len(payload) > 200_000:
+    if len(raw) > 200_000:
         return
 
     try:
-        j = json.loads(payload)
+        j = json_loads(raw)
     except Exception:
         return
     if not isinstance(j, dict):
         return
 
     invoked = j.get("address", "")
-    wsid = j.get("workspace_id")
-    status = j.get("status")
-
     if address.startswith("/reply/workspaces") or invoked == "/workspaces":
         WAITERS.set(f"workspaces:{src_ip}", j)
         DISCOVERY.add(src_ip, j)
         return
 
-    if isinstance(invoked, str) and invoked.endswith("/connect") and isinstance(wsid, str) and wsid:
-        WAITERS.set(f"connect:{src_ip}:{wsid}", j)
-        if status == "ok":
-            mark_seen(src_ip)
+    wsid = j.get("workspace_id")
+    if not isinstance(invoked, str) or not isinstance(wsid, str) or not wsid:
         return
 
-    if isinstance(invoked, str) and invoked.endswith("/thump") and isinstance(wsid, str) and wsid:
-        if status == "ok":
-            mark_seen(src_ip)
+    # dispatch O(1) sur le dernier segment de l'adresse invoquée
+    parts = invoked.rsplit("/", 2)
+    handler = _REPLY_HANDLERS.get(parts[-1])
+    if handler is not None:
+        handler(src_ip, parts, wsid, j)
+
+
+def _reply_connect(src_ip: str, parts: List[str], wsid: str, j: Dict[str, Any]) -> None:
+    WAITERS.set(f"connect:{src_ip}:{wsid}", j)
+    if j.get("status") == "ok":
+        mark_seen(src_ip)
+
+
+def _reply_thump(src_ip: str, parts: List[str], wsid: str, j: Dict[str, Any]) -> None:
+    if j.get("status") == "ok":
+        mark_seen(src_ip)
+
+
+def _reply_ack(src_ip: str, parts: List[str], wsid: str, j: Dict[str, Any]) -> None:
+    if j.get("status") != "ok":
         return
+    mark_seen(src_ip)
+    r = role_from_ip(src_ip)
+    if r and _on_ack:
+        _on_ack(src_ip, r)
+
+
+def _reply_select_ack(src_ip: str, parts: List[str], wsid: str, j: Dict[str, Any]) -> None:
+    # "next"/"previous" ne sont des ACK que sous ".../select/"
+    if len(parts) == 3 and parts[1] == "select":
+        _reply_ack(src_ip, parts, wsid, j)
+
+
+_REPLY_HANDLERS: Dict[str, Callable[[str, List[str], str, Dict[str, Any]], None]] = {
+    "connect": _reply_connect,
+    "thump": _reply_thump,
+    "go": _reply_ack,
+    "panic": _reply_ack,
+    "stop": _reply_ack,
+    "pause": _reply_ack,
+    "resume": _reply_ack,
+    "next": _reply_select_ack,
+    "previous": _reply_select_ack,
+}
+
+
+class OscReceiver(threading.Thread):
+    """
+    Réception OSC sur un seul thread : recvfrom -> parse -> _osc_handler en ligne.
+    Pas de thread créé par datagramme (contrairement à ThreadingOSCUDPServer) ;
+    le coût réel est le parse JSON, qui reste sur ce thread.
+    """
+    def __init__(self, sock: socket.socket) -> None:
+        super().__init__(daemon=True)
+        self.sock = sock
+        self._stop = False
+
+    def stop(self) -> None:
+        self._stop = True
+
+    def run(self) -> None:
+        while not self._stop:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                LOGGER.debug("OSC RX error: %s", e)
+                time.sleep(0.05)
+                continue
+
+            try:
+                packet = OscPacket(data)
+            except Exception:
+                continue
 
-    if status == "ok" and isinstance(wsid, str) and wsid and isinstance(invoked, str):
-        for suffix in ("/go", "/panic", "/stop", "/pause", "/resume", "/select/next", "/select/previous"):
-            if invoked.endswith(suffix):
-                mark_seen(src_ip)
-                r = role_from_ip(src_ip)
-                if r and _on_ack:
-                    _on_ack(src_ip, r)
-                break
+            for timed in packet.messages:
+                msg = timed.message
+                try:
+                    _osc_handler(addr, msg.address, *msg.params)
+                except Exception as e:
+                    LOGGER.debug("OSC RX handler error ip=%s: %s", addr[0], e)
 
 
 def start_osc_server() -> None:
@@ -438,27 +665,58 @@ def start_osc_server() -> None:
     if OSC_SERVER is not None:
         return
 
-    disp = dispatcher.Dispatcher()
-    disp.set_default_handler(_osc_handler, needs_reply_address=True)
-
-    server = osc_server.ThreadingOSCUDPServer((PI_LISTEN_IP, PI_REPLY_PORT), disp)
-    t = threading.Thread(target=server.serve_forever, daemon=True)
-    t.start()
-    OSC_SERVER = server
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, OSC_SOCK_BUF)
+    except OSError:
+        pass
+    sock.bind((PI_LISTEN_IP, PI_REPLY_PORT))
+    sock.settimeout(0.5)
+
+    rx = OscReceiver(sock)
+    rx.start()
+    OSC_SERVER = rx
     LOGGER.warning("SYS OSC server listening on %s:%d", PI_LISTEN_IP, PI_REPLY_PORT)
 
 
 # =========================
 # QLAB PROTOCOL HELPERS
 # =========================
-def ensure_app_flags(ip: str, force: bool = False, _last: Dict[str, float] = {}) -> None:
-    now = mono()
-    if not force and (now - _last.get(ip, 0.0)) < APPFLAGS_REFRESH_EVERY:
+# Dernier envoi (mono_ns) des chemins throttlés :
+# - flags app : clé (id chemin, ip) -> réglage par hôte
+# - /connect : clé (id chemin, ip, wsid) -> par workspace (plusieurs workspaces possibles sur un même Mac)
+THROTTLE_NS: Dict[Tuple[Any, ...], int] = {}
+THROTTLE_KEYS_MAX = 64
+_THR_APPFLAGS = 0
+_THR_CONNECT = 1
+_THR_CONNECT_OK = 2  # dernier /connect réussi (un échec ne doit pas masquer le retry forcé suivant)
+
+_APPFLAGS_BUNDLE: Optional[bytes] = None
+
+
+def _appflags_bundle() -> bytes:
+    # udpReplyPort + alwaysReply + forgetMeNot : contenu constant, construit une fois
+    global _APPFLAGS_BUNDLE
+    if _APPFLAGS_BUNDLE is None:
+        _APPFLAGS_BUNDLE = build_bundle([
+            (P_UDP_REPLY_PORT, (PI_REPLY_PORT,)),
+            (P_ALWAYS_REPLY, (1,)),
+            (P_FORGET_ME_NOT, (1,)),
+        ])
+    return _APPFLAGS_BUNDLE
+
+
+def _send_app_flags(ip: str, now: int) -> None:
+    THROTTLE_NS[(_THR_APPFLAGS, ip)] = now
+    SENDW.send_raw(ip, _appflags_bundle(), coalesce=True)
+
+
+def ensure_app_flags(ip: str, force: bool = False) -> None:
+    now = mono_ns()
+    ttl = FORCE_COALESCE_NS if force else APPFLAGS_REFRESH_EVERY_NS
+    if (now - THROTTLE_NS.get((_THR_APPFLAGS, ip), 0)) < ttl:
         return
-    _last[ip] = now
-    send_app(ip, P_UDP_REPLY_PORT, PI_REPLY_PORT)
-    send_app(ip, P_ALWAYS_REPLY, 1)
-    send_app(ip, P_FORGET_ME_NOT, 1)
+    _send_app_flags(ip, now)
 
 
 def parse_workspaces(reply_json: Dict[str, Any]) -> Dict[str, str]:
@@ -468,22 +726,26 @@ def parse_workspaces(reply_json: Dict[str, Any]) -> Dict[str, str]:
     if not isinstance(data, list):
         return {}
     out: Dict[str, str] = {}
+    _isinstance = isinstance
     for it in data:
-        if not isinstance(it, dict):
+        if not _isinstance(it, dict):
             continue
-        name = it.get("displayName") or it.get("name") or it.get("fileName")
-        uid = it.get("uniqueID") or it.get("id") or it.get("workspace_id")
-        if isinstance(name, str) and isinstance(uid, str):
-            base = name.replace(".qlab5", "").replace(".qlab4", "")
-            out[base] = uid
+        get = it.get
+        name = get("displayName") or get("name") or get("fileName")
+        uid = get("uniqueID") or get("id") or get("workspace_id")
+        if not (_isinstance(name, str) and _isinstance(uid, str)):
+            continue
+        # extension en fin de nom seulement : slice, pas de str.replace() systématique
+        if name.endswith(".qlab5") or name.endswith(".qlab4"):
+            name = name[:-6]
+        out[name] = uid
     return out
 
 
 def request_workspaces(ip: str, timeout: float = 0.9) -> Optional[Dict[str, Any]]:
-    key = f"workspaces:{ip}"
-    ev = WAITERS.arm(key)
-    send_app(ip, P_WORKSPACES)
-    if not ev.wait(timeout):
+    key = WAITERS.arm(f"workspaces:{ip}")
+    send_app(ip, P_WORKSPACES, coalesce=True)
+    if not WAITERS.wait(key, timeout):
         WAITERS.cleanup(key)
         return None
     payload = WAITERS.pop(key)
@@ -493,15 +755,14 @@ def request_workspaces(ip: str, timeout: float = 0.9) -> Optional[Dict[str, Any]
 def connect_endpoint(ep: Endpoint, timeout: float = 0.7) -> bool:
     if not ep.workspace_id:
         return False
-    key = f"connect:{ep.ip}:{ep.workspace_id}"
-    ev = WAITERS.arm(key)
+    key = WAITERS.arm(f"connect:{ep.ip}:{ep.workspace_id}")
 
     if OSC_PASSCODE:
-        send_ws(ep.ip, ep.workspace_id, "connect", OSC_PASSCODE)
+        send_ws(ep.ip, ep.workspace_id, "connect", OSC_PASSCODE, coalesce=True)
     else:
-        send_ws(ep.ip, ep.workspace_id, "connect")
+        send_ws(ep.ip, ep.workspace_id, "connect", coalesce=True)
 
-    if not ev.wait(timeout):
+    if not WAITERS.wait(key, timeout):
         WAITERS.cleanup(key)
         return False
 
@@ -512,44 +773,97 @@ def connect_endpoint(ep: Endpoint, timeout: float = 0.7) -> bool:
     return False
 
 
-def ensure_connected(ep: Endpoint, force: bool = False, _last: Dict[str, float] = {}) -> None:
+def ensure_connected(ep: Endpoint, force: bool = False) -> bool:
+    """
+    True si un /connect a abouti (maintenant, ou récemment si l'appel est coalescé / throttlé).
+    """
     if not ep.workspace_id:
-        return
-    now = mono()
-    if not force and (now - _last.get(ep.ip, 0.0)) < CONNECT_REFRESH_EVERY:
-        return
-    _last[ep.ip] = now
+        return False
+    now = mono_ns()
+    if force:
+        # plusieurs appelants forcés à quelques ms d'écart (warmup puis action, heal) : un seul aller-retour
+        if (now - THROTTLE_NS.get((_THR_CONNECT_OK, ep.ip, ep.workspace_id), 0)) < FORCE_COALESCE_NS:
+            return True
+    else:
+        if (now - THROTTLE_NS.get((_THR_CONNECT, ep.ip, ep.workspace_id), 0)) < CONNECT_REFRESH_EVERY_NS:
+            return (now - THROTTLE_NS.get((_THR_CONNECT_OK, ep.ip, ep.workspace_id), 0)) < CONNECT_REFRESH_EVERY_NS
+    THROTTLE_NS[(_THR_CONNECT, ep.ip, ep.workspace_id)] = now
 
-    if connect_endpoint(ep):
-        return
+    ok = connect_endpoint(ep)
+    if not ok:
+        # bundle perdu / QLab redémarré : renvoi immédiat des flags, hors coalescence
+        _send_app_flags(ep.ip, mono_ns())
+        ok = connect_endpoint(ep)
+    if ok:
+        THROTTLE_NS[(_THR_CONNECT_OK, ep.ip, ep.workspace_id)] = mono_ns()
+    return ok
+
+
+# =========================
+# ROLE POOL (I/O par rôle en parallèle)
+# =========================
+# Pool persistant (pas de création de thread par appui) : warmup/pairing attendent
+# max(RTT) des unités au lieu de la somme main -> backup -> aux.
+ROLE_POOL = ThreadPoolExecutor(max_workers=len(ROLES), thread_name_prefix="role")
 
-    ensure_app_flags(ep.ip, force=True)
-    connect_endpoint(ep)
+
+def map_roles(fn: Callable[[Any], Any], items: Any) -> List[Any]:
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(x) for x in items]
+    return list(ROLE_POOL.map(fn, items))
 
 
 # =========================
 # BROADCAST OSC (raw UDP + SO_BROADCAST)
 # =========================
 def osc_broadcast_send(bcast_ip: str, port: int, path: str, args: List[Any]) -> None:
-    msg = OscMessageBuilder(address=path)
-    for a in args:
-        msg.add_arg(a)
-    dgram = msg.build().dgram
+    osc_broadcast_send_dgram(bcast_ip, port, build_dgram(path, args))
 
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    try:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.sendto(dgram, (bcast_ip, port))
-    finally:
-        s.close()
+
+# Socket broadcast créé une fois (pas de socket()/setsockopt()/close() par envoi).
+# sendto() depuis plusieurs threads (discovery, fan-out) est sûr sans verrou.
+_BCAST_SOCK = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+_BCAST_SOCK.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+_BCAST_SOCK.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+
+def osc_broadcast_send_dgram(bcast_ip: str, port: int, dgram: bytes) -> None:
+    _BCAST_SOCK.sendto(dgram, (bcast_ip, port))
+
+
+def osc_broadcast_send_many(bcast_ip: str, port: int, msgs: List[Tuple[str, List[Any]]]) -> None:
+    """
+    Rafale broadcast (ex. flags + /workspaces de la discovery) : tous les datagrammes
+    sont encodés d'abord, puis envoyés dos à dos sur le socket broadcast partagé.
+    """
+    dgrams = [build_dgram(path, args) for path, args in msgs]
+    addr = (bcast_ip, port)
+    sendto = _BCAST_SOCK.sendto
+    for d in dgrams:
+        sendto(d, addr)
+
+
+def send_ws_broadcast(bcast_ip: str, wsids: List[str], suffix: str, *args: Any) -> None:
+    """
+    Fan-out en 1 paquet : un bundle broadcast contenant /workspace/{wsid}/{suffix}
+    pour chaque wsid. Chaque QLab n'exécute que les messages de ses propres workspaces.
+
+    Envoyé depuis _TX_SOCK (socket du /connect avec passcode), pas depuis _BCAST_SOCK,
+    et de façon synchrone : une erreur (OSError, buffer plein compris) remonte à
+    l'appelant pour qu'il bascule en unicast.
+    """
+    msgs = [(f"/workspace/{wsid}/{suffix}".replace("//", "/"), args) for wsid in wsids]
+    _TX_SOCK.sendto(build_bundle(msgs), (bcast_ip, QLAB_PORT))
 
 
 # =========================
 # STATE FORMAT (helpers)
 # =========================
-def load_paired_endpoints() -> Dict[str, Endpoint]:
-    st = STATE.load()
+def load_paired_endpoints(st: Optional[Dict[str, Any]] = None) -> Dict[str, Endpoint]:
+    # st déjà chargé par l'appelant (tick daemon) -> pas de second stat()/copie
+    if st is None:
+        st = STATE.load()
     if not st.get("paired"):
         raise SystemExit("Not paired. Run discovery/pairing first.")
     eps = st.get("endpoints", {})
@@ -589,3 +903,9 @@ def save_paired_state(assigned: Dict[str, Endpoint]) -> None:
     }
     STATE.save(st)
     refresh_role_map_from_state(st)
+
+    # pré-encode GO/PAUSE/PANIC... des workspaces appairés (repart d'un cache vide)
+    _CONTROL_DGRAMS.clear()
+    for ep in assigned.values():
+        if ep.workspace_id:
+            control_dgrams(ep.workspace_id)
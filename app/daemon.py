@@ -20,12 +20,14 @@ LED (résumé) :
 - Conflit bloquant (noms ambigus / doublons) : violet fixe (toutes) jusqu’à nouveau PAIR
 """
 
-import argparse
+import array
 import os
+import queue
+import random
 import sys
 import threading
-import time
-from typing import Any, Dict
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from app import core as qc
 from app import discover as qd
@@ -43,7 +45,7 @@ except Exception:
     GPIO_ENABLED = False
 
 try:
-    from rpi_ws281x import PixelStrip, Color, ws
+    from rpi_ws281x import PixelStrip, ws
     WS2812_AVAILABLE = True
 except Exception:
     WS2812_AVAILABLE = False
@@ -59,6 +61,10 @@ def dim(c: tuple[int, int, int]) -> tuple[int, int, int]:
     f = max(0.0, min(1.0, MASTER_DIM))
     return (int(c[0]*f), int(c[1]*f), int(c[2]*f))
 
+def pack_rgb(c: tuple[int, int, int]) -> int:
+    # même encodage que rpi_ws281x.Color(r, g, b)
+    return (c[0] << 16) | (c[1] << 8) | c[2]
+
 C_OFF     = (0, 0, 0)
 C_BLUE    = (0, 0, 255)
 C_GREEN   = (0, 255, 0)
@@ -76,12 +82,22 @@ DISCOVERY_BCAST_IP = getattr(cfg, "DISCOVERY_BCAST_IP", "255.255.255.255")
 DISCOVERY_WAIT_SEC = getattr(cfg, "DISCOVERY_WAIT_SEC", 1.2)
 
 LED_TICK = 0.05
+LED_FADE_FRAME_NS = 20_000_000  # cadence du fondu de fin de flash
+LED_IDLE_WAIT_SEC = 1.0          # rien d'animé : on dort jusqu'au prochain set_state/flash
 
 RECONCILE_EVERY = getattr(cfg, "RECONCILE_EVERY", 5.0)
 
+# GO/PAUSE/PANIC... en un seul bundle broadcast (toutes les unités sur le même segment réseau)
+USE_BROADCAST_FANOUT = getattr(cfg, "USE_BROADCAST_FANOUT", False)
+# Adresse de broadcast du fan-out : jamais déduite de l'IP (le masque réel est inconnu)
+FANOUT_BCAST_IP = getattr(cfg, "FANOUT_BCAST_IP", None) or DISCOVERY_BCAST_IP
+
 OFFLINE_BACKOFF_MIN = 2.0
 OFFLINE_BACKOFF_MAX = 20.0
 OFFLINE_BACKOFF_FACTOR = 2.0
+OFFLINE_BACKOFF_JITTER = 0.2  # ±20% : désynchronise les retries quand plusieurs unités tombent ensemble
+
+RECONCILE_EVERY_NS = qc.sec_ns(RECONCILE_EVERY)
 
 BLINK_TOGGLE_SLOW = 1.0
 BLINK_TOGGLE_FAST = 0.25
@@ -91,6 +107,10 @@ MISSING_RED_SEC = 10.0
 ACK_FLASH_SEC = 0.25
 ACK_RETURN_FADE_SEC = 0.25
 
+MISSING_RED_NS = qc.sec_ns(MISSING_RED_SEC)
+ACK_RETURN_FADE_NS = qc.sec_ns(ACK_RETURN_FADE_SEC)
+HEAL_MISMATCH_RED_NS = 3_000_000_000
+
 # =========================
 # GPIO PINS (BCM)
 # =========================
@@ -125,8 +145,9 @@ DISCOVERY_ACTIVE = False
 _PAIR_FATAL_FAIL = False
 _PAIR_CONFLICT = False
 
-_MISSING_UNTIL: Dict[str, float] = {"backup": 0.0, "aux": 0.0}
-_HEAL_MISMATCH_UNTIL: Dict[str, float] = {"main": 0.0, "backup": 0.0, "aux": 0.0}
+# échéances en ns (qc.mono_ns())
+_MISSING_UNTIL: Dict[str, int] = {"backup": 0, "aux": 0}
+_HEAL_MISMATCH_UNTIL: Dict[str, int] = dict.fromkeys(qc.ROLES, 0)
 
 # =========================
 # RESTART / UNPAIR
@@ -148,8 +169,8 @@ def force_unpair_state() -> None:
 
     _PAIR_FATAL_FAIL = False
     _PAIR_CONFLICT = False
-    _MISSING_UNTIL["backup"] = 0.0
-    _MISSING_UNTIL["aux"] = 0.0
+    _MISSING_UNTIL["backup"] = 0
+    _MISSING_UNTIL["aux"] = 0
 
     qc.LOGGER.info("CFG UNPAIRED (state purged)")
 # =========================
@@ -160,7 +181,7 @@ class Ws2812Controller:
         self.enabled = WS2812_AVAILABLE
         self._lock = threading.Lock()
         self.led_count = led_count
-        self._pixels: list[tuple[int, int, int]] = [(0, 0, 0)] * led_count
+        self._pixels = array.array("I", [0]) * led_count  # couleurs packées 0xRRGGBB
         self.strip = None
 
         if not self.enabled or not WS2812_ENABLED:
@@ -194,18 +215,24 @@ class Ws2812Controller:
             qc.LOGGER.warning("LED WS2812 init failed, continuing without LEDs: %s", e)
 
     def set_pixel(self, idx: int, rr: int, gg: int, bb: int) -> None:
-        if not (0 <= idx < self.led_count):
-            return
-        with self._lock:
-            self._pixels[idx] = (rr, gg, bb)
+        self.set_pixel_packed(idx, (rr << 16) | (gg << 8) | bb)
+
+    def set_pixel_packed(self, idx: int, packed: int) -> bool:
+        """Retourne True si le pixel a changé (frame à renvoyer)."""
+        # Pas de verrou : seul LEDWorker écrit, show() prend le verrou pour l'envoi.
+        if 0 <= idx < self.led_count and self._pixels[idx] != packed:
+            self._pixels[idx] = packed
+            return True
+        return False
 
     def show(self) -> None:
         if not self.enabled or self.strip is None:
             return
         with self._lock:
-            for idx, (rr, gg, bb) in enumerate(self._pixels):
-                self.strip.setPixelColor(idx, Color(rr, gg, bb))
-            self.strip.show()
+            strip = self.strip
+            for idx, packed in enumerate(self._pixels):
+                strip.setPixelColor(idx, packed)
+            strip.show()
 
 
 class RGB:
@@ -237,13 +264,15 @@ class LEDWorker(threading.Thread):
     def __init__(self) -> None:
         super().__init__(daemon=True)
         self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
         self._steady: Dict[str, tuple[int, int, int]] = {
             r: dim(C_OFF) for r in LED_BY_ROLE.keys()
         }
         self._blink: Dict[str, bool] = {r: False for r in LED_BY_ROLE.keys()}
-        self._toggle: Dict[str, float] = {r: BLINK_TOGGLE_NORM for r in LED_BY_ROLE.keys()}
-        self._flash_until: Dict[str, float] = {r: 0.0 for r in LED_BY_ROLE.keys()}
-        self._fade_start: Dict[str, float] = {r: 0.0 for r in LED_BY_ROLE.keys()}
+        # toutes les échéances/périodes en ns (qc.mono_ns())
+        self._toggle: Dict[str, int] = {r: qc.sec_ns(BLINK_TOGGLE_NORM) for r in LED_BY_ROLE.keys()}
+        self._flash_until: Dict[str, int] = {r: 0 for r in LED_BY_ROLE.keys()}
+        self._fade_start: Dict[str, int] = {r: 0 for r in LED_BY_ROLE.keys()}
         self._fade_from: Dict[str, tuple[int, int, int]] = {
             r: dim(C_OFF) for r in LED_BY_ROLE.keys()
         }
@@ -255,17 +284,24 @@ class LEDWorker(threading.Thread):
 
     def set_state(self, role: str, steady_rgb: tuple[int, int, int],
                   blink: bool, toggle_sec: float = BLINK_TOGGLE_NORM) -> None:
-        with self._lock:
+        toggle_ns = qc.sec_ns(max(0.05, float(toggle_sec)))
+        with self._cond:
+            # appelé à chaque tick daemon : ne réveille le rendu que sur vrai changement
+            if (self._steady.get(role) == steady_rgb and self._blink.get(role) == blink
+                    and self._toggle.get(role) == toggle_ns):
+                return
             self._steady[role] = steady_rgb
             self._blink[role] = blink
-            self._toggle[role] = max(0.05, float(toggle_sec))
+            self._toggle[role] = toggle_ns
+            self._cond.notify()
 
     def flash_ack(self, role: str, duration: float = ACK_FLASH_SEC) -> None:
-        with self._lock:
-            self._flash_until[role] = qc.mono() + duration
+        with self._cond:
+            self._flash_until[role] = qc.mono_ns() + qc.sec_ns(duration)
+            self._cond.notify()
 
-    def _blink_on(self, now: float, toggle_sec: float) -> bool:
-        return (int(now / toggle_sec) % 2) == 0
+    def _blink_on(self, now_ns: int, toggle_ns: int) -> bool:
+        return (now_ns // toggle_ns) & 1 == 0
 
     @staticmethod
     def _lerp_rgb(a: tuple[int, int, int], b: tuple[int, int, int], t: float) -> tuple[int, int, int]:
@@ -276,54 +312,77 @@ class LEDWorker(threading.Thread):
             int(a[2] + (b[2] - a[2]) * t),
         )
 
+    def _render(self, now: int) -> int:
+        """
+        Calcule et pousse la frame courante (verrou tenu).
+        Retourne la prochaine échéance (ns) à laquelle la frame changera, 0 si aucune.
+        """
+        dirty = False
+        next_ns = 0
+
+        def _due(t: int) -> None:
+            nonlocal next_ns
+            if not next_ns or t < next_ns:
+                next_ns = t
+
+        for role, led in LED_BY_ROLE.items():
+            flash_until = self._flash_until.get(role, 0)
+            if now < flash_until:
+                self._flash_active[role] = True
+                color = dim(C_BLUE)
+                self._last_rendered[role] = color
+                dirty |= WS2812.set_pixel_packed(led.pixel_index, pack_rgb(color))
+                _due(flash_until)
+                continue
+
+            if self._flash_active.get(role, False):
+                # Fin de flash ACK : fondu doux vers l'état nominal
+                self._flash_active[role] = False
+                self._fade_start[role] = now
+                self._fade_from[role] = self._last_rendered.get(role, dim(C_BLUE))
+
+            steady = self._steady.get(role, dim(C_OFF))
+            do_blink = self._blink.get(role, False)
+            toggle = self._toggle[role]
+            blink_on = self._blink_on(now, toggle)
+
+            if do_blink:
+                _due(((now // toggle) + 1) * toggle)
+            if do_blink and not blink_on:
+                target = dim(C_OFF)
+            else:
+                target = steady
+
+            fade_t0 = self._fade_start.get(role, 0)
+            if fade_t0 > 0:
+                dt = now - fade_t0
+                if dt < ACK_RETURN_FADE_NS:
+                    start = self._fade_from.get(role, dim(C_BLUE))
+                    color = self._lerp_rgb(start, target, dt / ACK_RETURN_FADE_NS)
+                    _due(min(now + LED_FADE_FRAME_NS, fade_t0 + ACK_RETURN_FADE_NS))
+                else:
+                    self._fade_start[role] = 0
+                    color = target
+            else:
+                color = target
+
+            self._last_rendered[role] = color
+            dirty |= WS2812.set_pixel_packed(led.pixel_index, pack_rgb(color))
+
+        # frame identique (cas nominal "vert fixe") : pas de strip.show()
+        if dirty:
+            WS2812.show()
+        return next_ns
+
     def run(self) -> None:
-        while not self._stop:
-            now = qc.mono()
-
-            with self._lock:
-                for role, led in LED_BY_ROLE.items():
-                    flash_active = now < self._flash_until.get(role, 0.0)
-                    if flash_active:
-                        self._flash_active[role] = True
-                        color = dim(C_BLUE)
-                        self._last_rendered[role] = color
-                        led.apply(*color)
-                        continue
-
-                    if self._flash_active.get(role, False):
-                        # Fin de flash ACK : fondu doux vers l'état nominal
-                        self._flash_active[role] = False
-                        self._fade_start[role] = now
-                        self._fade_from[role] = self._last_rendered.get(role, dim(C_BLUE))
-
-                    steady = self._steady.get(role, dim(C_OFF))
-                    do_blink = self._blink.get(role, False)
-                    toggle = self._toggle.get(role, BLINK_TOGGLE_NORM)
-                    blink_on = self._blink_on(now, toggle)
-
-                    if do_blink and not blink_on:
-                        target = dim(C_OFF)
-                    else:
-                        target = steady
-
-                    fade_t0 = self._fade_start.get(role, 0.0)
-                    if fade_t0 > 0:
-                        dt = now - fade_t0
-                        if dt < ACK_RETURN_FADE_SEC:
-                            start = self._fade_from.get(role, dim(C_BLUE))
-                            color = self._lerp_rgb(start, target, dt / ACK_RETURN_FADE_SEC)
-                        else:
-                            self._fade_start[role] = 0.0
-                            color = target
-                    else:
-                        color = target
-
-                    self._last_rendered[role] = color
-                    led.apply(*color)
-
-                WS2812.show()
-
-            time.sleep(0.02)
+        with self._cond:
+            while not self._stop:
+                now = qc.mono_ns()
+                next_ns = self._render(now)
+                if next_ns:
+                    self._cond.wait(timeout=max(0, next_ns - now) / 1e9)
+                else:
+                    self._cond.wait(timeout=LED_IDLE_WAIT_SEC)
 
 
 LEDW = LEDWorker()
@@ -357,16 +416,17 @@ def set_led_conflict() -> None:
         LEDW.set_state(r, dim(C_VIOLET), blink=False)
 
 
-def set_led_role_state(role: str, present: bool, online: bool) -> None:
-    now = qc.mono()
+def set_led_role_state(role: str, present: bool, online: bool, now: Optional[int] = None) -> None:
+    if now is None:
+        now = qc.mono_ns()
 
-    mismatch_until = _HEAL_MISMATCH_UNTIL.get(role, 0.0)
+    mismatch_until = _HEAL_MISMATCH_UNTIL.get(role, 0)
     if mismatch_until and now < mismatch_until:
         LEDW.set_state(role, dim(C_RED), blink=False)
         return
 
     if not present:
-        until = _MISSING_UNTIL.get(role, 0.0)
+        until = _MISSING_UNTIL.get(role, 0)
         if until and now < until:
             LEDW.set_state(role, dim(C_RED), blink=False)
             return
@@ -384,20 +444,28 @@ def set_led_role_state(role: str, present: bool, online: bool) -> None:
 # =========================
 # ACTIONS
 # =========================
+def _warmup_one(ep: qc.Endpoint) -> None:
+    qc.ensure_app_flags(ep.ip, force=True)
+    qc.ensure_connected(ep, force=True)
+
+
 def warmup_before_action(eps: Dict[str, qc.Endpoint]) -> None:
-    for role in ("main", "backup", "aux"):
-        ep = eps.get(role)
-        if not ep or not ep.workspace_id:
-            continue
-        qc.ensure_app_flags(ep.ip, force=True)
-        qc.ensure_connected(ep, force=True)
+    targets = [ep for ep in (eps.get(role) for role in qc.ROLES) if ep and ep.workspace_id]
+    qc.map_roles(_warmup_one, targets)
 
 
 def send_action(eps: Dict[str, qc.Endpoint], suffix: str) -> None:
-    for role in ("main", "backup", "aux"):
-        ep = eps.get(role)
-        if ep and ep.workspace_id:
-            qc.send_ws_fast(ep.ip, ep.workspace_id, suffix)
+    targets = [ep for ep in (eps.get(role) for role in qc.ROLES) if ep and ep.workspace_id]
+
+    if USE_BROADCAST_FANOUT and len(targets) > 1:
+        try:
+            qc.send_ws_broadcast(FANOUT_BCAST_IP, [ep.workspace_id for ep in targets], suffix)
+            return
+        except OSError as e:
+            qc.LOGGER.debug("ACTION broadcast fan-out failed, unicast fallback: %s", e)
+
+    for ep in targets:
+        qc.send_ws_precomputed(ep, suffix)
 
 
 def pause_toggle(eps: Dict[str, qc.Endpoint]) -> None:
@@ -421,15 +489,15 @@ def heal_reconcile_strict() -> None:
     - met à jour workspace_id seulement si workspace_name attendu est présent
     - force flags/connect
     """
+    st = qc.STATE.load()
     try:
-        eps = qc.load_paired_endpoints()
+        eps = qc.load_paired_endpoints(st)
     except Exception:
         qc.LOGGER.info("HEAL ignored: not paired")
         return
 
-    st = qc.STATE.load()
-
-    for role in ("main", "backup", "aux"):
+    dirty = False  # une seule écriture state.json (fsync SD) même si plusieurs wsid changent
+    for role in qc.ROLES:
         ep = eps.get(role)
         if not ep or not ep.workspace_id or not ep.workspace_name:
             continue
@@ -440,7 +508,7 @@ def heal_reconcile_strict() -> None:
             wsmap = qc.parse_workspaces(r) if r else {}
             if ep.workspace_name not in wsmap:
                 LEDW.set_state(role, dim(C_RED), blink=False)
-                _HEAL_MISMATCH_UNTIL[role] = qc.mono() + 3.0
+                _HEAL_MISMATCH_UNTIL[role] = qc.mono_ns() + HEAL_MISMATCH_RED_NS
                 qc.LOGGER.warning(
                     "HEAL mismatch %s ip=%s expected ws='%s' not open",
                     role.upper(), ep.ip, ep.workspace_name,
@@ -453,26 +521,29 @@ def heal_reconcile_strict() -> None:
                 st.setdefault("endpoints", {}).setdefault(role, {})
                 st["endpoints"][role]["workspace_id"] = new_id
                 st["endpoints"][role]["workspace_name"] = ep.workspace_name
-                qc.STATE.save(st)
-                qc.refresh_role_map_from_state(st)
+                dirty = True
                 qc.LOGGER.warning(
                     "HEAL wsid update %s '%s' -> %s",
                     role.upper(), ep.workspace_name, new_id,
                 )
 
             qc.ensure_connected(ep, force=True)
-            _HEAL_MISMATCH_UNTIL[role] = 0.0
+            _HEAL_MISMATCH_UNTIL[role] = 0
             LEDW.flash_ack(role, 0.15)
         except Exception as e:
             qc.LOGGER.debug("HEAL %s failed: %s", role, e)
 
+    if dirty:
+        qc.STATE.save(st)
+        qc.refresh_role_map_from_state(st)
+
 # =========================
 # DISCOVERY / PAIR WRAPPER
 # =========================
 def _mark_incomplete_roles(assigned: Dict[str, qc.Endpoint]) -> None:
-    now = qc.mono()
-    _MISSING_UNTIL["backup"] = (now + MISSING_RED_SEC) if ("backup" not in assigned) else 0.0
-    _MISSING_UNTIL["aux"] = (now + MISSING_RED_SEC) if ("aux" not in assigned) else 0.0
+    now = qc.mono_ns()
+    _MISSING_UNTIL["backup"] = (now + MISSING_RED_NS) if ("backup" not in assigned) else 0
+    _MISSING_UNTIL["aux"] = (now + MISSING_RED_NS) if ("aux" not in assigned) else 0
 
 
 def run_pairing_auto() -> None:
@@ -514,50 +585,55 @@ def run_pairing_auto() -> None:
 # =========================
 # WATCHDOG + RECONCILE
 # =========================
-_last_thump_sent: Dict[str, float] = {}
-_last_reconcile: Dict[str, float] = {}
+# horodatages / échéances en ns (qc.mono_ns()) ; _offline_backoff en secondes
+# LRU borné : chaque HEAL/changement de wsid crée une nouvelle clé (ip, wsid)
+THUMP_KEYS_MAX = 128
+_last_thump_sent: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+_last_reconcile: Dict[str, int] = {}
 _offline_backoff: Dict[str, float] = {}
-_offline_next_try: Dict[str, float] = {}
+_offline_next_try: Dict[str, int] = {}
 
 
-def thump_fire(ep: qc.Endpoint) -> None:
+def thump_fire(ep: qc.Endpoint, now: int) -> None:
     if not ep.workspace_id:
         return
 
     qc.ensure_app_flags(ep.ip, force=False)
     qc.ensure_connected(ep, force=False)
 
-    now = qc.mono()
-    k = f"{ep.ip}:{ep.workspace_id}"
-    if (now - _last_thump_sent.get(k, 0.0)) < qc.HEARTBEAT_INTERVAL:
+    k = (ep.ip, ep.workspace_id)
+    if (now - _last_thump_sent.get(k, 0)) < qc.HEARTBEAT_INTERVAL_NS:
         return
     _last_thump_sent[k] = now
+    _last_thump_sent.move_to_end(k)
+    if len(_last_thump_sent) > THUMP_KEYS_MAX:
+        _last_thump_sent.popitem(last=False)
 
-    qc.send_ws(ep.ip, ep.workspace_id, "thump")
+    qc.send_ws(ep.ip, ep.workspace_id, "thump", coalesce=True)
 
 
-def offline_gate(role: str) -> bool:
-    return qc.mono() >= _offline_next_try.get(role, 0.0)
+def offline_gate(role: str, now: int) -> bool:
+    return now >= _offline_next_try.get(role, 0)
 
 
 def bump_offline_backoff(role: str) -> None:
     cur = _offline_backoff.get(role, 0.0)
     cur = OFFLINE_BACKOFF_MIN if cur <= 0 else min(OFFLINE_BACKOFF_MAX, cur * OFFLINE_BACKOFF_FACTOR)
-    _offline_backoff[role] = cur
-    _offline_next_try[role] = qc.mono() + cur
+    _offline_backoff[role] = cur  # base non bruitée : la progression reste géométrique
+    wait = min(OFFLINE_BACKOFF_MAX, cur * (1.0 + random.uniform(-OFFLINE_BACKOFF_JITTER, OFFLINE_BACKOFF_JITTER)))
+    _offline_next_try[role] = qc.mono_ns() + qc.sec_ns(wait)
 
 
 def reset_offline_backoff(role: str) -> None:
     _offline_backoff[role] = 0.0
-    _offline_next_try[role] = 0.0
+    _offline_next_try[role] = 0
 
 
-def reconcile_endpoint(role: str, ep: qc.Endpoint) -> bool:
-    if not offline_gate(role):
+def reconcile_endpoint(role: str, ep: qc.Endpoint, now: int, st: Dict[str, Any]) -> bool:
+    if not offline_gate(role, now):
         return False
 
-    now = qc.mono()
-    if (now - _last_reconcile.get(role, 0.0)) < RECONCILE_EVERY:
+    if (now - _last_reconcile.get(role, 0)) < RECONCILE_EVERY_NS:
         return False
     _last_reconcile[role] = now
 
@@ -590,7 +666,6 @@ def reconcile_endpoint(role: str, ep: qc.Endpoint) -> bool:
         qc.LOGGER.warning("WSID changed for %s '%s': %s -> %s", role.upper(), desired, old_id, new_id)
         changed = True
 
-        st = qc.STATE.load()
         st.setdefault("endpoints", {}).setdefault(role, {})
         st["endpoints"][role]["workspace_id"] = new_id
         st["endpoints"][role]["workspace_name"] = desired
@@ -598,7 +673,6 @@ def reconcile_endpoint(role: str, ep: qc.Endpoint) -> bool:
         qc.refresh_role_map_from_state(st)
 
     qc.ensure_connected(ep, force=True)
-    qc.ensure_app_flags(ep.ip, force=True)
 
     reset_offline_backoff(role)
     return changed
@@ -620,10 +694,34 @@ def edge_guard(key: str, min_dt: float) -> bool:
 
 GPIO_BUTTONS: Dict[str, Any] = {}
 
+# Travaux longs déclenchés par bouton (pairing, heal) : un worker persistant + file bornée
+# au lieu d'un thread créé par appui ; les appuis en rafale au-delà de la file sont ignorés.
+_BTN_QUEUE: "queue.Queue[Tuple[Callable[..., None], tuple]]" = queue.Queue(maxsize=8)
+
+
+def _btn_worker() -> None:
+    while True:
+        fn, args = _BTN_QUEUE.get()
+        try:
+            fn(*args)
+        except Exception:
+            qc.LOGGER.debug("BTN worker error in %s", getattr(fn, "__name__", fn), exc_info=True)
+
+
+def _btn_submit(fn: Callable[..., None], *args: Any) -> None:
+    try:
+        _BTN_QUEUE.put_nowait((fn, args))
+    except queue.Full:
+        qc.LOGGER.warning("BTN queue full, dropping %s", getattr(fn, "__name__", fn))
+
 _pair_pressed_mono = 0.0
 _pair_held_fired = False
 
 class RotaryEncoder:
+    """
+    Encodeur rotatif sur alertes lgpio (fronts CLK) : plus de boucle de polling 1 ms,
+    le noyau ne réveille le process que sur un front réel.
+    """
     def __init__(self, pin_clk: int, pin_dt: int, callback_cw, callback_ccw):
         import lgpio
         self._lg = lgpio
@@ -632,51 +730,47 @@ class RotaryEncoder:
         self.pin_clk = pin_clk
         self.pin_dt = pin_dt
 
-        lgpio.gpio_claim_input(self.chip, pin_clk)
+        lgpio.gpio_claim_alert(self.chip, pin_clk, lgpio.BOTH_EDGES)
         lgpio.gpio_claim_input(self.chip, pin_dt)
 
         self.callback_cw = callback_cw
         self.callback_ccw = callback_ccw
-        self.event_cooldown = ENCODER_EVENT_COOLDOWN
-        self.dir_glitch_sec = ENCODER_DIR_GLITCH_SEC
+        self.event_cooldown_ns = qc.sec_ns(ENCODER_EVENT_COOLDOWN)
+        self.dir_glitch_ns = qc.sec_ns(ENCODER_DIR_GLITCH_SEC)
 
-        self.last_clk = lgpio.gpio_read(self.chip, pin_clk)
-        self._last_emit_mono = 0.0
+        self._last_emit_tick = 0  # tick lgpio (ns)
         self._last_dir = 0  # +1=cw, -1=ccw
-        self._running = True
-
-        threading.Thread(target=self._loop, daemon=True).start()
-
-    def _loop(self):
-        while self._running:
-            clk = self._lg.gpio_read(self.chip, self.pin_clk)
-
-            if clk != self.last_clk:
-                dt = self._lg.gpio_read(self.chip, self.pin_dt)
-                direction = 1 if dt != clk else -1
-                now = qc.mono()
-
-                # Filtrage anti-rebond / anti-glitch:
-                # - limite à 1 événement toutes les `event_cooldown` secondes
-                # - ignore un changement de direction quasi instantané (glitch)
-                too_soon = (now - self._last_emit_mono) < self.event_cooldown
-                glitch_reverse = (
-                    self._last_dir != 0
-                    and direction != self._last_dir
-                    and (now - self._last_emit_mono) < self.dir_glitch_sec
-                )
 
-                if not too_soon and not glitch_reverse:
-                    self._last_emit_mono = now
-                    self._last_dir = direction
+        # garder la référence : sinon le callback est collecté et les alertes perdues
+        self._cb = lgpio.callback(self.chip, pin_clk, lgpio.BOTH_EDGES, self._on_edge)
+
+    def _on_edge(self, chip: int, gpio: int, level: int, tick: int) -> None:
+        if level > 1:
+            return  # 2 = timeout watchdog, pas un front
+
+        dt = self._lg.gpio_read(self.chip, self.pin_dt)
+        direction = 1 if dt != level else -1
+        since = tick - self._last_emit_tick
+
+        # Filtrage anti-rebond / anti-glitch (horodatage lgpio, pas d'appel horloge Python):
+        # - limite à 1 événement toutes les `event_cooldown` secondes
+        # - ignore un changement de direction quasi instantané (glitch)
+        too_soon = since < self.event_cooldown_ns
+        glitch_reverse = (
+            self._last_dir != 0
+            and direction != self._last_dir
+            and since < self.dir_glitch_ns
+        )
+        if too_soon or glitch_reverse:
+            return
 
-                    if direction > 0:
-                        self.callback_cw()
-                    else:
-                        self.callback_ccw()
+        self._last_emit_tick = tick
+        self._last_dir = direction
 
-            self.last_clk = clk
-            time.sleep(0.001)
+        if direction > 0:
+            self.callback_cw()
+        else:
+            self.callback_ccw()
 
 def button_setup() -> None:
     global _pair_pressed_mono, _pair_held_fired
@@ -685,20 +779,28 @@ def button_setup() -> None:
         qc.LOGGER.info("GPIO disabled (gpiozero not available).")
         return
 
+    threading.Thread(target=_btn_worker, daemon=True, name="btn-worker").start()
+
     GPIO_BUTTONS["go"] = Button(PIN_BTN_GO, pull_up=True, bounce_time=BTN_BOUNCE)
     GPIO_BUTTONS["pause"] = Button(PIN_BTN_PAUSE, pull_up=True, bounce_time=BTN_BOUNCE)
     GPIO_BUTTONS["panic"] = Button(PIN_BTN_PANIC, pull_up=True, bounce_time=BTN_BOUNCE)
 
-    def do_go() -> None:
-        qc.LOGGER.info("BTN GO pressed")
-        if not edge_guard("go", BTN_HOLD_IGNORE):
-            return
-        try:
-            eps = qc.load_paired_endpoints()
-            warmup_before_action(eps)
-            send_action(eps, "go")
-        except Exception as e:
-            qc.LOGGER.debug("BTN GO ignored: %s", e)
+    def _make_action_handler(key: str, suffix: str) -> Callable[[], None]:
+        # GO / PANIC / UP / DOWN : même séquence, seuls la clé d'anti-rebond et le suffixe OSC changent
+        tag = key.upper()
+
+        def handler() -> None:
+            qc.LOGGER.info("BTN %s pressed", tag)
+            if not edge_guard(key, BTN_HOLD_IGNORE):
+                return
+            try:
+                eps = qc.load_paired_endpoints()
+                warmup_before_action(eps)
+                send_action(eps, suffix)
+            except Exception as e:
+                qc.LOGGER.debug("BTN %s ignored: %s", tag, e)
+
+        return handler
 
     def do_pause() -> None:
         qc.LOGGER.info("BTN PAUSE pressed")
@@ -711,38 +813,10 @@ def button_setup() -> None:
         except Exception as e:
             qc.LOGGER.debug("BTN PAUSE ignored: %s", e)
 
-    def do_panic() -> None:
-        qc.LOGGER.info("BTN PANIC pressed")
-        if not edge_guard("panic", BTN_HOLD_IGNORE):
-            return
-        try:
-            eps = qc.load_paired_endpoints()
-            warmup_before_action(eps)
-            send_action(eps, "panic")
-        except Exception as e:
-            qc.LOGGER.debug("BTN PANIC ignored: %s", e)
-
-    def do_up() -> None:
-        qc.LOGGER.info("BTN UP pressed")
-        if not edge_guard("up", BTN_HOLD_IGNORE):
-            return
-        try:
-            eps = qc.load_paired_endpoints()
-            warmup_before_action(eps)
-            send_action(eps, "select/previous")
-        except Exception as e:
-            qc.LOGGER.debug("BTN UP ignored: %s", e)
-
-    def do_down() -> None:
-        qc.LOGGER.info("BTN DOWN pressed")
-        if not edge_guard("down", BTN_HOLD_IGNORE):
-            return
-        try:
-            eps = qc.load_paired_endpoints()
-            warmup_before_action(eps)
-            send_action(eps, "select/next")
-        except Exception as e:
-            qc.LOGGER.debug("BTN DOWN ignored: %s", e)
+    do_go = _make_action_handler("go", "go")
+    do_panic = _make_action_handler("panic", "panic")
+    do_up = _make_action_handler("up", "select/previous")
+    do_down = _make_action_handler("down", "select/next")
 
     def do_pair_pressed() -> None:
         global _pair_pressed_mono, _pair_held_fired
@@ -758,7 +832,7 @@ def button_setup() -> None:
             force_unpair_state()
         except Exception:
             pass
-        threading.Thread(target=run_pairing_auto, daemon=True).start()
+        _btn_submit(run_pairing_auto)
 
     def do_pair_released() -> None:
         global _pair_pressed_mono, _pair_held_fired
@@ -773,13 +847,14 @@ def button_setup() -> None:
             if not edge_guard("pair_short_heal", 0.5):
                 return
             qc.LOGGER.info("BTN PAIR short -> HEAL/RECONCILE STRICT")
-            threading.Thread(target=heal_reconcile_strict, daemon=True).start()
+            # le heal relit state.json quand le worker l'exécute (le tick a pu l'écrire entre-temps)
+            _btn_submit(heal_reconcile_strict)
             return
 
         if not edge_guard("pair_short", 0.5):
             return
 
-        threading.Thread(target=run_pairing_auto, daemon=True).start()
+        _btn_submit(run_pairing_auto)
 
     GPIO_BUTTONS["go"].when_pressed = do_go
     GPIO_BUTTONS["pause"].when_pressed = do_pause
@@ -823,18 +898,10 @@ def button_setup() -> None:
 # =========================
 def _inject_last_seen(eps: Dict[str, qc.Endpoint]) -> None:
     try:
-        lock = getattr(qc, "_last_seen_lock", None)
-        if lock:
-            with lock:
-                for ep in eps.values():
-                    ts = qc.LAST_SEEN_BY_IP.get(ep.ip)
-                    if ts:
-                        ep.last_seen_mono = max(ep.last_seen_mono, ts)
-        else:
-            for ep in eps.values():
-                ts = qc.LAST_SEEN_BY_IP.get(ep.ip)
-                if ts:
-                    ep.last_seen_mono = max(ep.last_seen_mono, ts)
+        for ep in eps.values():
+            ts = qc.LAST_SEEN_BY_IP.get(ep.ip)
+            if ts:
+                ep.last_seen_mono = max(ep.last_seen_mono, ts)
     except Exception:
         pass
 
@@ -852,12 +919,24 @@ def run_daemon() -> None:
     qc.LOGGER.info("SYS daemon running (%s).", "GPIO OK" if GPIO_ENABLED else "NO GPIO backend")
 
     last_net_log = 0.0
-    last_status_line = ""
-    last_status_mono = 0.0
+    last_status_key: Optional[tuple] = None
+    last_status_mono = 0
     HEARTBEAT_LOG_SEC = 60.0  # 0 pour désactiver le heartbeat périodique
+    heartbeat_log_ns = qc.sec_ns(HEARTBEAT_LOG_SEC)
 
+    # cadence sur échéance monotone : la durée du corps ne décale pas les ticks,
+    # et RESTART_EVENT réveille l'attente immédiatement
+    tick_ns = qc.sec_ns(LED_TICK)
+    next_deadline = qc.mono_ns()
 
     while True:
+        slack = next_deadline - qc.mono_ns()
+        if slack > 0:
+            RESTART_EVENT.wait(slack / 1e9)
+        else:
+            next_deadline = qc.mono_ns()  # dépassement : on recale la phase (pas de rafale de rattrapage)
+        next_deadline += tick_ns
+
         if RESTART_EVENT.is_set():
             restart_self()
             return
@@ -878,63 +957,70 @@ def run_daemon() -> None:
             set_led_never_paired()
         else:
             try:
-                eps = qc.load_paired_endpoints()
+                # même snapshot que ci-dessus : un seul STATE.load() par tick
+                eps = qc.load_paired_endpoints(st)
             except Exception:
                 set_led_fatal_fail()
-                time.sleep(LED_TICK)
                 continue
 
             _inject_last_seen(eps)
 
-            for role in ("main", "backup", "aux"):
-                ep = eps.get(role)
-                if ep:
-                    thump_fire(ep)
-
-            for role in ("main", "backup", "aux"):
+            # une seule passe par rôle, une seule lecture horloge par tick
+            now = qc.mono_ns()
+            online_by_role: Dict[str, bool] = {}
+            for role in qc.ROLES:
                 ep = eps.get(role)
-                if not ep:
+                if ep is None:
+                    set_led_role_state(role, False, False, now)
                     continue
-                if ep.online:
+                online = ep.online_at(now)
+                online_by_role[role] = online
+                thump_fire(ep, now)
+                if online:
                     reset_offline_backoff(role)
                 else:
-                    reconcile_endpoint(role, ep)
-
-            set_led_role_state("main", "main" in eps, eps["main"].online if "main" in eps else False)
-            set_led_role_state("backup", "backup" in eps, eps["backup"].online if "backup" in eps else False)
-            set_led_role_state("aux", "aux" in eps, eps["aux"].online if "aux" in eps else False)
-
-            main_present = "main" in eps
-            bkp_present = "backup" in eps
-            aux_present = "aux" in eps
-            main_online = eps["main"].online if main_present else False
-            bkp_online = eps["backup"].online if bkp_present else False
-            aux_online = eps["aux"].online if aux_present else False
+                    reconcile_endpoint(role, ep, now, st)
+                set_led_role_state(role, True, online, now)
+
+            main_ep = eps.get("main")
+            bkp_ep = eps.get("backup")
+            aux_ep = eps.get("aux")
+            main_present = main_ep is not None
+            bkp_present = bkp_ep is not None
+            aux_present = aux_ep is not None
+            main_online = online_by_role.get("main", False)
+            bkp_online = online_by_role.get("backup", False)
+            aux_online = online_by_role.get("aux", False)
 
             # log seulement si changement (et optionnellement heartbeat)
-            now = qc.mono()
-            parts = []
-            if main_present:
-                parts.append(f"MAIN {'ONLINE' if main_online else 'OFFLINE'} ip={eps['main'].ip} ws='{eps['main'].workspace_name}'")
-            else:
-                parts.append("MAIN NOT_PAIRED")
+            # clé de comparaison en primitives : la ligne texte n'est formatée que si elle sert
+            status_key = (
+                main_present, main_online, main_ep and main_ep.ip, main_ep and main_ep.workspace_name,
+                bkp_present, bkp_online, bkp_ep and bkp_ep.ip, bkp_ep and bkp_ep.workspace_name,
+                aux_present, aux_online, aux_ep and aux_ep.ip, aux_ep and aux_ep.workspace_name,
+            )
+            changed = (status_key != last_status_key)
+            heartbeat_due = (HEARTBEAT_LOG_SEC > 0 and (now - last_status_mono) >= heartbeat_log_ns)
 
-            if bkp_present:
-                parts.append(f"BACKUP {'ONLINE' if bkp_online else 'OFFLINE'} ip={eps['backup'].ip} ws='{eps['backup'].workspace_name}'")
-            else:
-                parts.append("BACKUP NOT_PAIRED")
+            if changed or heartbeat_due:
+                parts = []
+                if main_ep is not None:
+                    parts.append(f"MAIN {'ONLINE' if main_online else 'OFFLINE'} ip={main_ep.ip} ws='{main_ep.workspace_name}'")
+                else:
+                    parts.append("MAIN NOT_PAIRED")
 
-            if aux_present:
-                parts.append(f"AUX {'ONLINE' if aux_online else 'OFFLINE'} ip={eps['aux'].ip} ws='{eps['aux'].workspace_name}'")
-            else:
-                parts.append("AUX NOT_PAIRED")
+                if bkp_ep is not None:
+                    parts.append(f"BACKUP {'ONLINE' if bkp_online else 'OFFLINE'} ip={bkp_ep.ip} ws='{bkp_ep.workspace_name}'")
+                else:
+                    parts.append("BACKUP NOT_PAIRED")
 
-            status_line = "NET " + " | ".join(parts)
+                if aux_ep is not None:
+                    parts.append(f"AUX {'ONLINE' if aux_online else 'OFFLINE'} ip={aux_ep.ip} ws='{aux_ep.workspace_name}'")
+                else:
+                    parts.append("AUX NOT_PAIRED")
 
-            changed = (status_line != last_status_line)
-            heartbeat_due = (HEARTBEAT_LOG_SEC > 0 and (now - last_status_mono) >= HEARTBEAT_LOG_SEC)
+                status_line = "NET " + " | ".join(parts)
 
-            if changed or heartbeat_due:
                 # WARNING uniquement si problème, INFO si tout est OK
                 has_problem = (not main_present) or (main_present and not main_online) or (bkp_present and not bkp_online) or (aux_present and not aux_online)
                 if has_problem:
@@ -942,15 +1028,16 @@ def run_daemon() -> None:
                 else:
                     qc.LOGGER.info(status_line)
 
-                last_status_line = status_line
+                last_status_key = status_key
                 last_status_mono = now
 
-        time.sleep(LED_TICK)
-
 # =========================
 # CLI
 # =========================
 def main() -> None:
+    # argparse seulement pour l'usage CLI direct : launch.py importe ce module sans lui
+    import argparse
+
     p = argparse.ArgumentParser(description="QLabTrigger daemon (GPIO + LEDs).")
     sub = p.add_subparsers(dest="cmd", required=True)
 
@@ -6,7 +6,7 @@ Découverte QLab en OSC (broadcast), puis pairing (main/backup/aux).
 
 Principes :
 - On ne valide QLab que via la réponse /workspaces (parse_workspaces()).
-- Discovery en 2 phases, et la phase 2 est systématique (sécurise udpReplyPort / alwaysReply / forgetMeNot).
+- Discovery en 1 phase : flags (udpReplyPort / alwaysReply / forgetMeNot) puis /workspaces, une seule fenêtre d'écoute.
 - Pairing déterministe :
   - 1 seul workspace "sans suffixe" => MAIN
   - "_main" et "_backup" : on choisit un couple cohérent (même base) en priorité
@@ -18,8 +18,8 @@ Gestion d'ambiguïtés / conflits :
 - plusieurs bases "_main" sans couple "_backup" => CONFLIT (bloquant)
 """
 
-import argparse
 import json
+import logging
 import time
 from dataclasses import dataclass
 from typing import Dict, Tuple, List, Optional
@@ -46,22 +46,31 @@ class Candidate:
     base: str   # base du nom (avant suffixe)
 
 
+# Tables figées à l'import : _classify est appelé N_responders x N_workspaces fois.
+# Ordre d'insertion : main écrase backup si les deux noms legacy sont identiques (priorité d'origine).
+_LEGACY: Dict[str, Tuple[str, str]] = {
+    qc.EXPECTED_WS_BACKUP: ("backup", "__legacy_expected__"),
+    qc.EXPECTED_WS_MAIN: ("main", "__legacy_expected__"),
+}
+_SUFFIX_TABLE: Tuple[Tuple[str, int, str], ...] = (
+    (qc.SUFFIX_MAIN, len(qc.SUFFIX_MAIN), "main"),
+    (qc.SUFFIX_BACKUP, len(qc.SUFFIX_BACKUP), "backup"),
+    (qc.SUFFIX_AUX1, len(qc.SUFFIX_AUX1), "aux"),
+)
+
+
 def _classify(ws_name: str) -> Tuple[str, str]:
     """
     Retourne (kind, base).
     """
     # compat : noms fixes
-    if ws_name == qc.EXPECTED_WS_MAIN:
-        return ("main", "__legacy_expected__")
-    if ws_name == qc.EXPECTED_WS_BACKUP:
-        return ("backup", "__legacy_expected__")
-
-    if ws_name.endswith(qc.SUFFIX_MAIN):
-        return ("main", ws_name[: -len(qc.SUFFIX_MAIN)])
-    if ws_name.endswith(qc.SUFFIX_BACKUP):
-        return ("backup", ws_name[: -len(qc.SUFFIX_BACKUP)])
-    if ws_name.endswith(qc.SUFFIX_AUX1):
-        return ("aux", ws_name[: -len(qc.SUFFIX_AUX1)])
+    hit = _LEGACY.get(ws_name)
+    if hit is not None:
+        return hit
+
+    for suf, n, kind in _SUFFIX_TABLE:
+        if ws_name.endswith(suf):
+            return (kind, ws_name[:-n])
 
     return ("plain", ws_name)
 
@@ -85,8 +94,34 @@ def decide_roles(responders: List[Tuple[str, Dict[str, str]]]) -> Dict[str, qc.E
     if not cands:
         raise NoRespondersError("No valid QLab workspaces.")
 
-    # Aux1 (unique)
-    aux_cands = [c for c in cands if c.kind == "aux"]
+    # une seule passe : aux, main/backup par base (détecte doublons exacts), bases complètes
+    aux_cands: List[Candidate] = []
+    by_base: Dict[str, Dict[str, Candidate]] = {}
+    complete_bases: List[str] = []
+    main_bases: List[str] = []
+    plains: List[Candidate] = []
+    duplicate: Optional[Candidate] = None
+    for c in cands:
+        kind = c.kind
+        if kind == "aux":
+            aux_cands.append(c)
+        elif kind == "main" or kind == "backup":
+            slot = by_base.get(c.base)
+            if slot is None:
+                slot = by_base[c.base] = {}
+            if kind in slot:
+                if duplicate is None:
+                    duplicate = c
+                continue
+            slot[kind] = c
+            if kind == "main":
+                main_bases.append(c.base)
+            if len(slot) == 2:
+                complete_bases.append(c.base)
+        else:
+            plains.append(c)
+
+    # Aux1 (unique) : vérifié avant les doublons main/backup (même priorité d'erreur qu'avant)
     if len(aux_cands) > 1:
         raise ConflictError("Multiple *_aux1 candidates found.")
     aux_ep: Optional[qc.Endpoint] = None
@@ -94,18 +129,10 @@ def decide_roles(responders: List[Tuple[str, Dict[str, str]]]) -> Dict[str, qc.E
         c = aux_cands[0]
         aux_ep = qc.Endpoint(ip=c.ip, role="aux", workspace_name=c.ws_name, workspace_id=c.ws_id)
 
-    # main/backup by base (détecte doublons exacts)
-    by_base: Dict[str, Dict[str, Candidate]] = {}
-    for c in cands:
-        if c.kind not in ("main", "backup"):
-            continue
-        by_base.setdefault(c.base, {})
-        if c.kind in by_base[c.base]:
-            raise ConflictError(f"Duplicate {c.base}_{c.kind} candidate.")
-        by_base[c.base][c.kind] = c
+    if duplicate is not None:
+        raise ConflictError(f"Duplicate {duplicate.base}_{duplicate.kind} candidate.")
 
     # 1) priorité : une base qui a main+backup
-    complete_bases = [b for b, mm in by_base.items() if "main" in mm and "backup" in mm]
     selected_base: Optional[str] = None
     if complete_bases:
         complete_bases.sort()
@@ -114,7 +141,6 @@ def decide_roles(responders: List[Tuple[str, Dict[str, str]]]) -> Dict[str, qc.E
             qc.LOGGER.warning("PAIR: multiple complete bases=%s -> pick '%s'", complete_bases, selected_base)
     else:
         # 2) mains suffixés sans backup : doit être unique (sinon ambigu)
-        main_bases = [b for b, mm in by_base.items() if "main" in mm]
         if len(main_bases) > 1:
             main_bases.sort()
             raise ConflictError(f"Multiple *_main bases found (no matching *_backup): {main_bases}")
@@ -134,7 +160,6 @@ def decide_roles(responders: List[Tuple[str, Dict[str, str]]]) -> Dict[str, qc.E
             assigned["backup"] = qc.Endpoint(ip=b.ip, role="backup", workspace_name=b.ws_name, workspace_id=b.ws_id)
     else:
         # 3) fallback : un seul workspace "plain"
-        plains = [c for c in cands if c.kind == "plain"]
         if len(plains) == 0:
             raise NoRespondersError("No selectable workspace (need *_main or a single plain workspace).")
         if len(plains) > 1:
@@ -152,43 +177,40 @@ def decide_roles(responders: List[Tuple[str, Dict[str, str]]]) -> Dict[str, qc.E
 
 def discover_by_broadcast(bcast_ip: str = "255.255.255.255", wait_sec: float = 1.2) -> List[Tuple[str, Dict[str, str]]]:
     """
-    Discovery en 2 phases (phase 2 systématique).
-
-    Phase 1 :
-      - broadcast /workspaces
-
-    Phase 2 :
+    Discovery en 1 phase :
       - broadcast udpReplyPort/alwaysReply/forgetMeNot
       - broadcast /workspaces
+      - une fenêtre d'écoute de wait_sec
+
+    (Un QLab qui répondait au /workspaces "nu" répond aussi après les flags :
+    l'ancienne phase 1 ne faisait que doubler la latence.)
 
     Résultat :
-      - merge unique par IP
+      - unique par IP (DiscoveryStore indexé par IP)
     """
-    def _sleep_window() -> None:
-        t0 = qc.mono()
-        while qc.mono() - t0 < wait_sec:
-            time.sleep(0.05)
-
     def _log_snapshot(tag: str) -> List[Tuple[str, Dict[str, str]]]:
         snap = qc.DISCOVERY.snapshot()
-        qc.LOGGER.debug("%s: discovery store has %d IP(s): %s", tag, len(snap), sorted(list(snap.keys())))
+        # en INFO (prod) : ni tri, ni json.dumps, ni formatage pour des logs jetés
+        debug = qc.LOGGER.isEnabledFor(logging.DEBUG)
+        if debug:
+            qc.LOGGER.debug("%s: discovery store has %d IP(s): %s", tag, len(snap), sorted(snap.keys()))
 
         parsed: List[Tuple[str, Dict[str, str]]] = []
         for ip, payload in snap.items():
-            status = payload.get("status")
-            addr_field = payload.get("address")
-            data = payload.get("data")
-            qc.LOGGER.debug(
-                "%s: RX ip=%s status=%s addr_field=%s data_type=%s data_len=%s",
-                tag, ip, status, addr_field, type(data).__name__,
-                len(data) if isinstance(data, list) else None
-            )
+            if debug:
+                data = payload.get("data")
+                qc.LOGGER.debug(
+                    "%s: RX ip=%s status=%s addr_field=%s data_type=%s data_len=%s",
+                    tag, ip, payload.get("status"), payload.get("address"), type(data).__name__,
+                    len(data) if isinstance(data, list) else None
+                )
 
             wsmap = qc.parse_workspaces(payload)
             if wsmap:
-                qc.LOGGER.debug("%s: PARSED ip=%s workspaces=%s", tag, ip, list(wsmap.keys()))
+                if debug:
+                    qc.LOGGER.debug("%s: PARSED ip=%s workspaces=%s", tag, ip, list(wsmap.keys()))
                 parsed.append((ip, wsmap))
-            else:
+            elif debug:
                 try:
                     raw = json.dumps(payload, ensure_ascii=False)
                     qc.LOGGER.debug("%s: PARSE_FAIL ip=%s raw=%s", tag, ip, raw[:260] + ("..." if len(raw) > 260 else ""))
@@ -200,31 +222,20 @@ def discover_by_broadcast(bcast_ip: str = "255.255.255.255", wait_sec: float = 1
 
     qc.start_osc_server()
 
-    qc.DISCOVERY.clear()
-    qc.LOGGER.debug("DISCOVER phase1: broadcast /workspaces bcast=%s port=%d wait=%.2fs", bcast_ip, qc.QLAB_PORT, wait_sec)
-    qc.osc_broadcast_send(bcast_ip, qc.QLAB_PORT, qc.P_WORKSPACES, [])
-    _sleep_window()
-    r1 = _log_snapshot("DISCOVER phase1")
-
     qc.DISCOVERY.clear()
     qc.LOGGER.debug(
-        "DISCOVER phase2: broadcast flags + /workspaces bcast=%s port=%d reply_port=%d wait=%.2fs",
+        "DISCOVER: broadcast flags + /workspaces bcast=%s port=%d reply_port=%d wait=%.2fs",
         bcast_ip, qc.QLAB_PORT, qc.PI_REPLY_PORT, wait_sec
     )
-    qc.osc_broadcast_send(bcast_ip, qc.QLAB_PORT, qc.P_UDP_REPLY_PORT, [qc.PI_REPLY_PORT])
-    qc.osc_broadcast_send(bcast_ip, qc.QLAB_PORT, qc.P_ALWAYS_REPLY, [1])
-    qc.osc_broadcast_send(bcast_ip, qc.QLAB_PORT, qc.P_FORGET_ME_NOT, [1])
-    qc.osc_broadcast_send(bcast_ip, qc.QLAB_PORT, qc.P_WORKSPACES, [])
-    _sleep_window()
-    r2 = _log_snapshot("DISCOVER phase2")
-
-    merged: Dict[str, Dict[str, str]] = {}
-    for ip, wsmap in r1:
-        merged[ip] = wsmap
-    for ip, wsmap in r2:
-        merged[ip] = wsmap
-
-    responders = sorted([(ip, wsmap) for ip, wsmap in merged.items()], key=lambda x: x[0])
+    qc.osc_broadcast_send_many(bcast_ip, qc.QLAB_PORT, [
+        (qc.P_UDP_REPLY_PORT, [qc.PI_REPLY_PORT]),
+        (qc.P_ALWAYS_REPLY, [1]),
+        (qc.P_FORGET_ME_NOT, [1]),
+        (qc.P_WORKSPACES, []),
+    ])
+    time.sleep(wait_sec)  # les réponses arrivent sur le thread OscReceiver, rien à faire ici
+    responders = _log_snapshot("DISCOVER")
+
     qc.LOGGER.debug("DISCOVER done: %d responder(s) parsed as QLab", len(responders))
     return responders
 
@@ -240,16 +251,22 @@ def pair_auto(bcast_ip: str = "255.255.255.255", wait_sec: float = 1.2) -> Dict[
 
     assigned = decide_roles(responders)
 
-    for role, ep in assigned.items():
+    def _lock_one(item: Tuple[str, qc.Endpoint]) -> None:
+        role, ep = item
         qc.ensure_app_flags(ep.ip, force=True)
         qc.ensure_connected(ep, force=True)
         qc.LOGGER.info("PAIR lock %s ip=%s ws='%s' id=%s", role.upper(), ep.ip, ep.workspace_name, ep.workspace_id)
 
+    qc.map_roles(_lock_one, assigned.items())
+
     qc.save_paired_state(assigned)
     return assigned
 
 
 def main() -> None:
+    # argparse seulement pour l'usage CLI direct : launch.py importe ce module sans lui
+    import argparse
+
     p = argparse.ArgumentParser(description="QLab discovery/pairing tool (OSC broadcast).")
     sub = p.add_subparsers(dest="cmd", required=True)
 
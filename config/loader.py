@@ -1,38 +1,199 @@
 """Robust loader for user_config.py.
 
+The file is parsed (``ast``), never executed: only top-level ``NAME = <literal>``
+assignments are kept.
+
 Supports Python values and common lowercase JSON-like aliases:
 - true/false/null
+- names assigned earlier in the file (``B = A``)
+- simple numeric arithmetic (``RECONCILE_EVERY = 5 * 60``)
 """
 
 from __future__ import annotations
 
+import ast
+import functools
+import operator
 from pathlib import Path
-from types import SimpleNamespace
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+# Friendly aliases for non-Python habit (true/false/null)
+_ALIASES: Dict[str, Any] = {"true": True, "false": False, "null": None}
+# Names never exported to the config namespace (besides dunders)
+_RESERVED = frozenset(_ALIASES)
 
-def load_user_config() -> Any:
-    cfg_path = Path(__file__).with_name("user_config.py")
+_BINOPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+
+
+class _Resolve(ast.NodeTransformer):
+    """Replace known names by constants and fold numeric arithmetic, for ast.literal_eval."""
+
+    def __init__(self, env: Dict[str, Any]) -> None:
+        self.env = env
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.env:
+            return ast.copy_location(ast.Constant(self.env[node.id]), node)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        op = _BINOPS.get(type(node.op))
+        left, right = node.left, node.right
+        if (
+            op is not None
+            and isinstance(left, ast.Constant) and isinstance(right, ast.Constant)
+            and type(left.value) in (int, float) and type(right.value) in (int, float)
+        ):
+            return ast.copy_location(ast.Constant(op(left.value, right.value)), node)
+        return node
+
+
+def _parse_config(src: str, filename: str = "<user_config>") -> Dict[str, Any]:
+    tree = ast.parse(src, filename)
+    env: Dict[str, Any] = dict(_ALIASES)
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+
+        names = [t.id for t in targets if isinstance(t, ast.Name)]
+        if not names:
+            continue
+
+        try:
+            value = ast.literal_eval(_Resolve(env).visit(node.value))
+        except (ValueError, TypeError, SyntaxError, ArithmeticError):
+            # Non-literal value: ignored (keeps the other keys)
+            continue
+
+        for name in names:
+            env[name] = value
+
+    # Filter once at the end: set difference in C, then a cheap dunder prefix check
+    return {k: env[k] for k in env.keys() - _RESERVED if k[:2] != "__"}
+
+
+class UserConfig:
+    """
+    Read-only view of user_config.py with slotted attribute access.
+
+    A key missing from the file leaves its slot unset: attribute access raises
+    AttributeError, so ``getattr(cfg, NAME, default)`` keeps the code default.
+    Keys without a slot here are kept in ``_extras``. Instances are built by
+    ``_build`` only.
+    """
+    # OSC / network
+    QLAB_PORT: int
+    PI_LISTEN_IP: str
+    PI_REPLY_PORT: int
+    OSC_PASSCODE: Optional[str]
+
+    # Workspace naming
+    EXPECTED_WS_MAIN: str
+    EXPECTED_WS_BACKUP: str
+    SUFFIX_MAIN: str
+    SUFFIX_BACKUP: str
+    SUFFIX_AUX1: str
 
-    # Default namespace + friendly aliases for non-Python habit (true/false/null)
-    ns: Dict[str, Any] = {
-        "__file__": str(cfg_path),
-        "__name__": "config.user_config",
-        "true": True,
-        "false": False,
-        "null": None,
-    }
+    # Persistence / logs
+    LOG_DIR: str
+    STATE_DIR: str
 
+    # Daemon
+    STARTUP_FORCE_UNPAIR: bool
+    PAIR_HOLD_RESTART_SEC: float
+    DISCOVERY_BCAST_IP: str
+    DISCOVERY_WAIT_SEC: float
+    RECONCILE_EVERY: float
+    BACKUP_OPTIONAL: bool
+    AUX_OPTIONAL: bool
+    USE_BROADCAST_FANOUT: bool
+    FANOUT_BCAST_IP: Optional[str]
+
+    # GPIO / LEDs
+    WS2812_ENABLED: bool
+    MASTER_DIM: float
+    PIN_LED_DATA: int
+    LED_COUNT: int
+    LED_BRIGHTNESS: int
+    PIN_BTN_GO: int
+    PIN_BTN_PAUSE: int
+    PIN_BTN_PANIC: int
+    ENC_CLK: int
+    ENC_DT: int
+    ENC_SW: int
+    BTN_BOUNCE: float
+    BTN_HOLD_IGNORE: float
+    ENCODER_EVENT_COOLDOWN: float
+    ENCODER_DIR_GLITCH_SEC: float
+
+    _extras: Dict[str, Any]
+
+    # One slot per annotated key (hand-written: the Pi runs Python 3.9, no dataclass(slots=True))
+    __slots__ = tuple(__annotations__)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for unset slots and unknown names
+        if name != "_extras":
+            try:
+                return object.__getattribute__(self, "_extras")[name]
+            except (AttributeError, KeyError):
+                pass
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"UserConfig is read-only: cannot set {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"UserConfig is read-only: cannot delete {name!r}")
+
+
+_FIELDS = frozenset(UserConfig.__slots__) - {"_extras"}
+
+
+def _build(data: Dict[str, Any]) -> UserConfig:
+    # No __init__: only keys present in the file get a slot value
+    cfg = object.__new__(UserConfig)
+    extras: Dict[str, Any] = {}
+    for k, v in data.items():
+        if k in _FIELDS:
+            object.__setattr__(cfg, k, v)
+        else:
+            extras[k] = v
+    object.__setattr__(cfg, "_extras", extras)
+    return cfg
+
+
+@functools.lru_cache(maxsize=4)
+def _load_cached(path: str, mtime_ns: int, size: int) -> UserConfig:
+    # (mtime_ns, size) in the key: an edited file is re-parsed, an unchanged one never is
     try:
-        code = compile(cfg_path.read_text(encoding="utf-8"), str(cfg_path), "exec")
-        exec(code, ns, ns)
+        data = _parse_config(Path(path).read_bytes().decode("utf-8"), path)
     except Exception:
         # Keep runtime alive even if user file is malformed
-        return SimpleNamespace()
-
-    data = {
-        k: v
-        for k, v in ns.items()
-        if not k.startswith("__") and k not in {"true", "false", "null"}
-    }
-    return SimpleNamespace(**data)
+        data = {}
+    return _build(data)
+
+
+def load_user_config() -> UserConfig:
+    cfg_path = Path(__file__).with_name("user_config.py")
+
+    try:
+        st = cfg_path.stat()
+    except OSError:
+        return _build({})
+
+    # Frozen: the cached instance can be shared safely between callers
+    return _load_cached(str(cfg_path), st.st_mtime_ns, st.st_size)
@@ -28,6 +28,11 @@ DISCOVERY_WAIT_SEC = 1.2
 RECONCILE_EVERY = 5.0
 BACKUP_OPTIONAL = False
 AUX_OPTIONAL = True
+# Envoie GO/PAUSE/PANIC en un seul paquet broadcast (toutes les unités sur le même segment réseau)
+USE_BROADCAST_FANOUT = False
+# Adresse de broadcast du fan-out (ex. "192.168.1.255" en /24, "10.0.255.255" en /16).
+# None : reprend DISCOVERY_BCAST_IP (255.255.255.255 = segment local, quel que soit le masque)
+FANOUT_BCAST_IP = None
 
 # GPIO / LEDs
 WS2812_ENABLED = True
@@ -3,10 +3,23 @@
 
 """Point d'entrée principal QLab Box."""
 
-import argparse
+import sys
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, List, Optional
 
+if TYPE_CHECKING:
+    import argparse
+
+_BARE_CMDS = ("daemon", "unpair", "pair")
+_DISCOVERY_CMDS = ("discover", "pair-auto")
+_DEFAULT_BCAST = "255.255.255.255"
+_DEFAULT_WAIT = 1.2
+
+
+def build_parser() -> "argparse.ArgumentParser":
+    # argparse importé seulement pour --help / erreurs de syntaxe (voir _fast_args)
+    import argparse
 
-def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="QLab Box launcher")
     sub = parser.add_subparsers(dest="cmd", required=True)
 
@@ -15,32 +28,87 @@ def build_parser() -> argparse.ArgumentParser:
     sub.add_parser("pair", help="Run pairing once (for debug).")
 
     sp = sub.add_parser("discover", help="Broadcast /workspaces and list responders.")
-    sp.add_argument("--bcast", default="255.255.255.255")
-    sp.add_argument("--wait", type=float, default=1.2)
+    sp.add_argument("--bcast", default=_DEFAULT_BCAST)
+    sp.add_argument("--wait", type=float, default=_DEFAULT_WAIT)
 
     sp2 = sub.add_parser("pair-auto", help="Auto pair using broadcast discovery.")
-    sp2.add_argument("--bcast", default="255.255.255.255")
-    sp2.add_argument("--wait", type=float, default=1.2)
+    sp2.add_argument("--bcast", default=_DEFAULT_BCAST)
+    sp2.add_argument("--wait", type=float, default=_DEFAULT_WAIT)
 
     return parser
 
 
+def _is_number(tok: str) -> bool:
+    try:
+        float(tok)
+    except ValueError:
+        return False
+    return True
+
+
+def _fast_args(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    Dispatch direct des formes valides courantes (ex. `launch.py daemon` sous systemd),
+    sans construire le parser argparse. None -> repli argparse (--help, erreur, forme inconnue).
+    """
+    if not argv:
+        return None
+    cmd, rest = argv[0], argv[1:]
+
+    if cmd in _BARE_CMDS:
+        return SimpleNamespace(cmd=cmd) if not rest else None
+
+    if cmd not in _DISCOVERY_CMDS:
+        return None
+
+    opts = {"bcast": _DEFAULT_BCAST, "wait": _DEFAULT_WAIT}
+    i = 0
+    while i < len(rest):
+        tok = rest[i]
+        if "=" in tok:
+            key, val = tok.split("=", 1)
+            i += 1
+        elif i + 1 < len(rest):
+            key, val = tok, rest[i + 1]
+            i += 2
+        else:
+            return None
+        if val[:1] == "-" and not _is_number(val):
+            # `--bcast --wait` : argparse y voit une valeur manquante, pas bcast="--wait"
+            return None
+        if key == "--bcast":
+            opts["bcast"] = val
+        elif key == "--wait":
+            try:
+                opts["wait"] = float(val)
+            except ValueError:
+                return None
+        else:
+            return None
+    return SimpleNamespace(cmd=cmd, **opts)
+
+
 def main() -> None:
-    args = build_parser().parse_args()
+    args = _fast_args(sys.argv[1:])
+    if args is None:
+        args = build_parser().parse_args()
 
-    # Import retardé pour permettre `--help` même si les dépendances runtime
-    # ne sont pas encore installées dans l'environnement local.
-    from app import daemon, discover
+    # Import retardé, et seulement du module utile à la sous-commande :
+    # `--help` marche sans dépendances runtime, et `discover` / `pair-auto`
+    # n'importent pas la pile GPIO/LED de app.daemon.
+    if args.cmd in ("daemon", "unpair", "pair"):
+        from app import daemon
 
-    if args.cmd == "daemon":
-        daemon.run_daemon()
-        return
-    if args.cmd == "unpair":
-        daemon.force_unpair_state()
-        return
-    if args.cmd == "pair":
-        daemon.run_pairing_auto()
+        if args.cmd == "daemon":
+            daemon.run_daemon()
+        elif args.cmd == "unpair":
+            daemon.force_unpair_state()
+        else:
+            daemon.run_pairing_auto()
         return
+
+    from app import discover
+
     if args.cmd == "discover":
         responders = discover.discover_by_broadcast(args.bcast, args.wait)
         if not responders:
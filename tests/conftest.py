@@ -0,0 +1,22 @@
+import sys
+import types
+
+
+# Minimal stubs to import app.core/app.discover without external runtime deps.
+# Installed once here, before pytest imports any test module.
+pythonosc = types.ModuleType("pythonosc")
+pythonosc.osc_packet = types.SimpleNamespace(OscPacket=object)
+osc_builder = types.ModuleType("pythonosc.osc_message_builder")
+osc_builder.OscMessageBuilder = object
+osc_bundle = types.ModuleType("pythonosc.osc_bundle_builder")
+osc_bundle.OscBundleBuilder = object
+osc_bundle.IMMEDIATELY = 0
+
+_STUBS = {
+    "pythonosc": pythonosc,
+    "pythonosc.osc_packet": pythonosc.osc_packet,
+    "pythonosc.osc_message_builder": osc_builder,
+    "pythonosc.osc_bundle_builder": osc_bundle,
+}
+# Real modules (if installed and already imported) win, as with setdefault
+sys.modules.update({name: mod for name, mod in _STUBS.items() if name not in sys.modules})
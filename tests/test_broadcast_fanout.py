@@ -0,0 +1,31 @@
+import socket
+import unittest
+from unittest import mock
+
+from app import core
+
+
+class BroadcastFanoutTests(unittest.TestCase):
+    def test_fanout_leaves_from_the_connect_socket(self):
+        # même port source que /connect (passcode) : sinon QLab voit un client non connecté
+        with mock.patch.object(core, "_TX_SOCK") as tx, \
+                mock.patch.object(core, "_BCAST_SOCK") as bcast, \
+                mock.patch.object(core, "build_bundle", return_value=b"bundle"):
+            core.send_ws_broadcast("10.0.255.255", ["WS-MAIN", "WS-BKP"], "go")
+
+        tx.sendto.assert_called_once_with(b"bundle", ("10.0.255.255", core.QLAB_PORT))
+        bcast.sendto.assert_not_called()
+
+    def test_fanout_errors_reach_the_caller(self):
+        with mock.patch.object(core, "_TX_SOCK") as tx, \
+                mock.patch.object(core, "build_bundle", return_value=b"bundle"):
+            tx.sendto.side_effect = BlockingIOError()
+            with self.assertRaises(OSError):
+                core.send_ws_broadcast("255.255.255.255", ["WS-MAIN", "WS-BKP"], "panic")
+
+    def test_connect_socket_can_broadcast(self):
+        self.assertTrue(core._TX_SOCK.getsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from config import loader
+
+
+class ParseConfigTests(unittest.TestCase):
+    def test_literals_aliases_and_prior_names(self):
+        src = (
+            "QLAB_PORT = 53000\n"
+            "WS2812_ENABLED = true\n"
+            "PASSCODE = null\n"
+            "RECONCILE_EVERY: float = 5 * 60\n"
+            "BACKUP_PORT = QLAB_PORT\n"
+            "PINS = (5, 6, -12)\n"
+        )
+        self.assertEqual(
+            loader._parse_config(src),
+            {
+                "QLAB_PORT": 53000,
+                "WS2812_ENABLED": True,
+                "PASSCODE": None,
+                "RECONCILE_EVERY": 300,
+                "BACKUP_PORT": 53000,
+                "PINS": (5, 6, -12),
+            },
+        )
+
+    def test_skips_non_literal_and_dunder_assignments(self):
+        src = (
+            "import os\n"
+            "__version__ = '1'\n"
+            "LOG_DIR = os.getcwd()\n"
+            "STATE_DIR = '/var/lib/qlab-box'\n"
+        )
+        self.assertEqual(loader._parse_config(src), {"STATE_DIR": "/var/lib/qlab-box"})
+
+
+class UserConfigTests(unittest.TestCase):
+    def test_missing_keys_fall_back_to_getattr_default_and_extras_are_kept(self):
+        cfg = loader._build({"QLAB_PORT": 53100, "CUSTOM_FLAG": True})
+        self.assertEqual(cfg.QLAB_PORT, 53100)
+        self.assertEqual(getattr(cfg, "LOG_DIR", "/tmp/log"), "/tmp/log")
+        self.assertIs(cfg.CUSTOM_FLAG, True)
+        with self.assertRaises(AttributeError):
+            cfg.QLAB_PORT = 1
+
+    def test_slotted_and_read_only(self):
+        cfg = loader._build({"QLAB_PORT": 53100})
+        self.assertIn("_extras", loader.UserConfig.__slots__)
+        self.assertFalse(hasattr(cfg, "__dict__"))
+        with self.assertRaises(AttributeError):
+            del cfg.QLAB_PORT
+        with self.assertRaises(AttributeError):
+            cfg.NEW_KEY = 1
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+from app import core
+
+
+def _state(**wsids):
+    return {
+        "paired": True,
+        "endpoints": {
+            role: {"ip": f"10.0.0.{i}", "workspace_id": wsid}
+            for i, (role, wsid) in enumerate(wsids.items(), start=5)
+        },
+    }
+
+
+class ControlDgramsTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(core, "build_dgram", side_effect=lambda addr: addr.encode())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        core._CONTROL_DGRAMS.clear()
+        self.addCleanup(core._CONTROL_DGRAMS.clear)
+        self.addCleanup(core.refresh_role_map_from_state, {})
+
+    def test_healed_workspace_ids_are_pruned_on_refresh(self):
+        for wsid in ("WS-MAIN-OLD", "WS-AUX-OLD", "WS-MAIN", "WS-BACKUP", "WS-AUX"):
+            core.control_dgrams(wsid)
+
+        core.refresh_role_map_from_state(_state(main="WS-MAIN", backup="WS-BACKUP", aux="WS-AUX"))
+        self.assertEqual(set(core._CONTROL_DGRAMS), {"WS-MAIN", "WS-BACKUP", "WS-AUX"})
+        self.assertEqual(core.control_dgrams("WS-MAIN")["go"], b"/workspace/WS-MAIN/go")
+
+    def test_small_cache_is_left_alone(self):
+        core.control_dgrams("WS-MAIN")
+        core.control_dgrams("WS-NEW")
+
+        core.refresh_role_map_from_state(_state(main="WS-MAIN"))
+        self.assertEqual(set(core._CONTROL_DGRAMS), {"WS-MAIN", "WS-NEW"})
+
+
+if __name__ == "__main__":
+    unittest.main()
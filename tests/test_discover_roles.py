@@ -1,22 +1,5 @@
-import sys
-import types
 import unittest
 
-
-# Minimal stubs to import app.core/app.discover without external runtime deps.
-pythonosc = types.ModuleType("pythonosc")
-pythonosc.dispatcher = types.SimpleNamespace(Dispatcher=object)
-pythonosc.osc_server = types.SimpleNamespace(ThreadingOSCUDPServer=object)
-pythonosc.udp_client = types.SimpleNamespace(SimpleUDPClient=object)
-osc_builder = types.ModuleType("pythonosc.osc_message_builder")
-osc_builder.OscMessageBuilder = object
-
-sys.modules.setdefault("pythonosc", pythonosc)
-sys.modules.setdefault("pythonosc.dispatcher", pythonosc.dispatcher)
-sys.modules.setdefault("pythonosc.osc_server", pythonosc.osc_server)
-sys.modules.setdefault("pythonosc.udp_client", pythonosc.udp_client)
-sys.modules.setdefault("pythonosc.osc_message_builder", osc_builder)
-
 from app import discover
 
 
@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+
+from app import core
+
+
+class EnsureConnectedTests(unittest.TestCase):
+    def setUp(self):
+        core.THROTTLE_NS.clear()
+        self.connected = []
+
+        def fake_connect(ep, timeout=0.7):
+            self.connected.append(ep.workspace_id)
+            return True
+
+        patcher = mock.patch.object(core, "connect_endpoint", side_effect=fake_connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(core.THROTTLE_NS.clear)
+
+    def test_forced_connect_is_per_workspace_on_a_shared_host(self):
+        main = core.Endpoint(ip="10.0.0.5", role="main", workspace_name="show_main", workspace_id="WS-MAIN")
+        aux = core.Endpoint(ip="10.0.0.5", role="aux", workspace_name="show_aux1", workspace_id="WS-AUX")
+
+        self.assertTrue(core.ensure_connected(main, force=True))
+        self.assertTrue(core.ensure_connected(aux, force=True))
+        self.assertEqual(self.connected, ["WS-MAIN", "WS-AUX"])
+
+    def test_forced_connect_is_coalesced_for_the_same_workspace(self):
+        main = core.Endpoint(ip="10.0.0.5", role="main", workspace_name="show_main", workspace_id="WS-MAIN")
+
+        self.assertTrue(core.ensure_connected(main, force=True))
+        self.assertTrue(core.ensure_connected(main, force=True))
+        self.assertEqual(self.connected, ["WS-MAIN"])
+
+    def test_steady_state_does_not_report_an_unconnected_workspace(self):
+        main = core.Endpoint(ip="10.0.0.5", role="main", workspace_name="show_main", workspace_id="WS-MAIN")
+        aux = core.Endpoint(ip="10.0.0.5", role="aux", workspace_name="show_aux1", workspace_id="WS-AUX")
+
+        core.ensure_connected(main, force=False)
+        core.ensure_connected(aux, force=False)
+        self.assertEqual(self.connected, ["WS-MAIN", "WS-AUX"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+import launch
+
+
+class FastArgsTests(unittest.TestCase):
+    def test_bare_commands(self):
+        for cmd in ("daemon", "unpair", "pair"):
+            self.assertEqual(vars(launch._fast_args([cmd])), {"cmd": cmd})
+        self.assertIsNone(launch._fast_args(["daemon", "--verbose"]))
+
+    def test_discovery_defaults(self):
+        args = launch._fast_args(["discover"])
+        self.assertEqual(args.bcast, launch._DEFAULT_BCAST)
+        self.assertEqual(args.wait, launch._DEFAULT_WAIT)
+
+    def test_option_forms(self):
+        args = launch._fast_args(["pair-auto", "--bcast=10.0.255.255", "--wait", "2.5"])
+        self.assertEqual((args.cmd, args.bcast, args.wait), ("pair-auto", "10.0.255.255", 2.5))
+        args = launch._fast_args(["discover", "--wait=-1"])
+        self.assertEqual(args.wait, -1.0)
+
+    def test_missing_or_invalid_values_fall_back_to_argparse(self):
+        self.assertIsNone(launch._fast_args(["discover", "--bcast"]))
+        self.assertIsNone(launch._fast_args(["discover", "--bcast", "--wait", "2"]))
+        self.assertIsNone(launch._fast_args(["discover", "--wait", "soon"]))
+        self.assertIsNone(launch._fast_args(["discover", "--unknown", "1"]))
+
+    def test_help_and_unknown_commands_fall_back_to_argparse(self):
+        self.assertIsNone(launch._fast_args([]))
+        self.assertIsNone(launch._fast_args(["-h"]))
+        self.assertIsNone(launch._fast_args(["discover", "-h"]))
+        self.assertIsNone(launch._fast_args(["discover", "--help"]))
+        self.assertIsNone(launch._fast_args(["status"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
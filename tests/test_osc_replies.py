@@ -0,0 +1,98 @@
+import json
+import unittest
+from unittest import mock
+
+from app import core
+
+
+def _reply(address, wsid="WS-MAIN", status="ok"):
+    return json.dumps({"address": address, "workspace_id": wsid, "status": status})
+
+
+class ReplyDispatchTests(unittest.TestCase):
+    def setUp(self):
+        self.acks = []
+        core.set_ack_callback(lambda ip, role: self.acks.append((ip, role)))
+        self.addCleanup(core.set_ack_callback, None)
+        patcher = mock.patch.object(core, "role_from_ip", return_value="main")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        core.LAST_SEEN_BY_IP.clear()
+        self.addCleanup(core.LAST_SEEN_BY_IP.clear)
+
+    def test_select_next_is_an_ack_but_cue_next_is_not(self):
+        core._osc_handler(("10.0.0.5", 53001), "/reply", _reply("/workspace/WS-MAIN/select/next"))
+        core._osc_handler(("10.0.0.6", 53001), "/reply", _reply("/workspace/WS-MAIN/cue/next"))
+        self.assertEqual(self.acks, [("10.0.0.5", "main")])
+
+    def test_failed_go_is_not_an_ack(self):
+        core._osc_handler(("10.0.0.5", 53001), "/reply", _reply("/workspace/WS-MAIN/go", status="error"))
+        self.assertEqual(self.acks, [])
+        self.assertNotIn("10.0.0.5", core.LAST_SEEN_BY_IP)
+
+    def test_connect_and_thump_replies_mark_the_host_seen(self):
+        core._osc_handler(("10.0.0.5", 53001), "/reply", _reply("/workspace/WS-MAIN/connect"))
+        core._osc_handler(("10.0.0.6", 53001), "/reply", _reply("/workspace/WS-AUX/thump", wsid="WS-AUX"))
+        self.assertIn("10.0.0.5", core.LAST_SEEN_BY_IP)
+        self.assertIn("10.0.0.6", core.LAST_SEEN_BY_IP)
+        self.assertEqual(self.acks, [])
+
+
+class SendWorkerCoalesceTests(unittest.TestCase):
+    def setUp(self):
+        self.sock = mock.Mock()
+        self.worker = core.SendWorker(self.sock)  # non démarré : la file reste inspectable
+        patcher = mock.patch.object(core, "build_dgram", side_effect=lambda addr: addr.encode())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        core._CONTROL_DGRAMS.clear()
+        self.addCleanup(core._CONTROL_DGRAMS.clear)
+
+    def test_duplicate_pending_datagram_is_dropped_but_other_args_are_kept(self):
+        self.worker.send("10.0.0.5", 53000, b"/connect,i\x00\x01", coalesce=True)
+        self.worker.send("10.0.0.5", 53000, b"/connect,i\x00\x01", coalesce=True)
+        self.worker.send("10.0.0.5", 53000, b"/connect,i\x00\x02", coalesce=True)
+        self.worker.send("10.0.0.6", 53000, b"/connect,i\x00\x01", coalesce=True)
+        self.assertEqual(
+            list(self.worker._q),
+            [
+                ("10.0.0.5", 53000, b"/connect,i\x00\x01"),
+                ("10.0.0.5", 53000, b"/connect,i\x00\x02"),
+                ("10.0.0.6", 53000, b"/connect,i\x00\x01"),
+            ],
+        )
+
+    def test_repeated_control_commands_all_go_out_in_order(self):
+        dgrams = core.control_dgrams("WS-MAIN")
+        ep = core.Endpoint(ip="10.0.0.5", role="main", workspace_name="show_main", workspace_id="WS-MAIN")
+        with mock.patch.object(core, "SENDW", self.worker):
+            for sfx in ("pause", "resume", "pause", "go", "go", "select/next", "select/next"):
+                core.send_ws_precomputed(ep, sfx)
+            core.send_ws_precomputed(ep, "panic")
+            core.send_ws_precomputed(ep, "panic")
+
+        self.worker._flush(list(self.worker._q))
+        sent = [c.args[0] for c in self.sock.sendto.call_args_list]
+        self.assertEqual(
+            sent,
+            [dgrams[s] for s in ("pause", "resume", "pause", "go", "go", "select/next", "select/next", "panic")],
+        )
+
+
+class ReplyWaiterTests(unittest.TestCase):
+    def test_unarmed_key_is_ignored(self):
+        waiter = core.ReplyWaiter()
+        waiter.set("connect:10.0.0.5:WS-MAIN", {"status": "ok"})
+        self.assertFalse(waiter.wait("connect:10.0.0.5:WS-MAIN", 0))
+        self.assertIsNone(waiter.pop("connect:10.0.0.5:WS-MAIN"))
+
+    def test_armed_key_receives_its_payload(self):
+        waiter = core.ReplyWaiter()
+        key = waiter.arm("connect:10.0.0.5:WS-MAIN")
+        waiter.set(key, {"status": "ok"})
+        self.assertTrue(waiter.wait(key, 0))
+        self.assertEqual(waiter.pop(key), {"status": "ok"})
+
+
+if __name__ == "__main__":
+    unittest.main()
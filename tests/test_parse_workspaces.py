@@ -0,0 +1,38 @@
+import unittest
+
+from app import core
+
+
+class ParseWorkspacesTests(unittest.TestCase):
+    def test_strips_qlab_extension_suffix_only(self):
+        reply = {
+            "status": "ok",
+            "data": [
+                {"displayName": "show_main.qlab5", "uniqueID": "id-1"},
+                {"displayName": "show_backup.qlab4", "uniqueID": "id-2"},
+                {"displayName": "my.qlab5.copy", "uniqueID": "id-3"},
+            ],
+        }
+        self.assertEqual(
+            core.parse_workspaces(reply),
+            {"show_main": "id-1", "show_backup": "id-2", "my.qlab5.copy": "id-3"},
+        )
+
+    def test_falls_back_on_alternate_keys_and_skips_invalid_entries(self):
+        reply = {
+            "status": "ok",
+            "data": [
+                {"name": "plain", "id": "id-1"},
+                {"fileName": "other.qlab5", "workspace_id": "id-2"},
+                {"displayName": "no_id"},
+                "not-a-dict",
+            ],
+        }
+        self.assertEqual(core.parse_workspaces(reply), {"plain": "id-1", "other": "id-2"})
+
+    def test_rejects_non_ok_reply(self):
+        self.assertEqual(core.parse_workspaces({"status": "error", "data": []}), {})
+
+
+if __name__ == "__main__":
+    unittest.main()